@@ -0,0 +1,123 @@
+# airfield and runway database loaded from OurAirports-style csv files (airports.csv and runways.csv from
+# ourairports.com/data, or any files with the same columns). only airports with at least one open runway of
+# known length are kept, in compact columnar numpy arrays:
+#
+#   airports   ident, name (utf-8 bytes), elevation_ft (float32, nan when unknown)
+#   runways    per airport a contiguous slice runway_start[i]:runway_start[i+1] of label and length_ft (int32)
+#
+# idents and upper-cased names are kept in sorted order so a prefix search is two binary searches, e.g.
+#
+#   python airfields.py data/airports.csv data/runways.csv --query KNUW
+import argparse
+import sys
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+airport_columns = ['ident', 'name', 'elevation_ft']
+runway_columns = ['airport_ident', 'length_ft', 'closed', 'le_ident', 'he_ident']
+
+def _read_csv(path, columns, types):
+  return pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(include_columns=columns, column_types=types))
+
+def _bytes_array(column):
+  # a pyarrow string column as a fixed width utf-8 bytes array, 1 byte per character for ascii
+  values = column.fill_null('').to_pylist()
+  return np.array([value.encode() for value in values], dtype=bytes)
+
+def _prefix_range(keys, prefix):
+  # [start, stop) of the sorted keys beginning with prefix
+  prefix = prefix.upper().encode()
+  start = np.searchsorted(keys, prefix, 'left')
+  stop = np.searchsorted(keys, prefix + b'\xff', 'left')
+  return int(start), int(stop)
+
+class Airfields:
+  def __init__(self, ident, name, name_upper, elevation_ft, runway_start, runway_label, runway_length_ft):
+    self.ident = ident
+    self.name = name
+    self.elevation_ft = elevation_ft
+    self.runway_start = runway_start
+    self.runway_label = runway_label
+    self.runway_length_ft = runway_length_ft
+    # sorted search keys and the airport each one belongs to
+    self.ident_order = np.argsort(ident, kind='stable').astype(np.int32)
+    self.ident_keys = ident[self.ident_order]
+    self.name_order = np.argsort(name_upper, kind='stable').astype(np.int32)
+    self.name_keys = name_upper[self.name_order]
+
+  def __len__(self):
+    return len(self.ident)
+
+  @property
+  def nbytes(self):
+    return sum(array.nbytes for array in vars(self).values())
+
+  def search(self, prefix, limit=50):
+    # airport indices whose ident or name starts with prefix, ident matches first
+    prefix = prefix.strip()
+    if not prefix:
+      return []
+    matches = []
+    for keys, order in ((self.ident_keys, self.ident_order), (self.name_keys, self.name_order)):
+      start, stop = _prefix_range(keys, prefix)
+      for i in order[start:min(stop, start + limit)]:
+        if i not in matches:
+          matches.append(int(i))
+    return matches[:limit]
+
+  def describe(self, i):
+    return f'{self.ident[i].decode()} - {self.name[i].decode()}'
+
+  def runways(self, i):
+    # (label, length_ft) of every open runway at airport i, longest first
+    start, stop = self.runway_start[i], self.runway_start[i+1]
+    return [(label.decode(), int(length)) for label, length in zip(self.runway_label[start:stop], self.runway_length_ft[start:stop])]
+
+def load_airfields(airports_path, runways_path):
+  airports = _read_csv(airports_path, airport_columns, {'ident': pa.string(), 'name': pa.string(), 'elevation_ft': pa.float64()})
+  runways = _read_csv(runways_path, runway_columns, {'airport_ident': pa.string(), 'length_ft': pa.float64(), 'closed': pa.string(),
+    'le_ident': pa.string(), 'he_ident': pa.string()})
+
+  # open runways of known length, at airports in the airports file
+  closed = pc.fill_null(pc.equal(runways['closed'], '1'), False)
+  runways = runways.filter(pc.and_(pc.invert(closed), pc.fill_null(pc.greater(runways['length_ft'], 0), False)))
+  runways = runways.filter(pc.is_in(runways['airport_ident'], value_set=airports['ident']))
+  airports = airports.filter(pc.is_in(airports['ident'], value_set=pc.unique(runways['airport_ident'])))
+
+  ident = _bytes_array(airports['ident'])
+  airport_of_runway = pc.index_in(runways['airport_ident'], value_set=airports['ident']).to_numpy()
+  length_ft = runways['length_ft'].to_numpy().astype(np.int32)
+  # group the runways by airport, longest first within each airport
+  order = np.lexsort((-length_ft, airport_of_runway))
+  runway_start = np.searchsorted(airport_of_runway[order], np.arange(len(ident) + 1)).astype(np.int32)
+  le_ident, he_ident = _bytes_array(runways['le_ident'])[order], _bytes_array(runways['he_ident'])[order]
+  runway_label = np.char.add(np.char.add(le_ident, b'/'), he_ident)
+
+  return Airfields(
+    ident, _bytes_array(airports['name']), _bytes_array(pc.utf8_upper(airports['name'])), airports['elevation_ft'].to_numpy().astype(np.float32),
+    runway_start, runway_label, length_ft[order])
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Load an OurAirports-style airfield database and search it.')
+  parser.add_argument('airports', help='airports csv')
+  parser.add_argument('runways', help='runways csv')
+  parser.add_argument('--query', action='append', default=[], help='ident or name prefix to search for')
+  args = parser.parse_args(argv)
+
+  start = time.perf_counter()
+  airfields = load_airfields(args.airports, args.runways)
+  print(f'{len(airfields)} airports, {len(airfields.runway_length_ft)} runways in {time.perf_counter() - start:.2f} s, '
+        f'{airfields.nbytes/(1 << 20):.1f} MB', file=sys.stderr)
+  for query in args.query:
+    start = time.perf_counter()
+    matches = airfields.search(query)
+    print(f'{query!r}: {len(matches)} matches in {(time.perf_counter() - start)*1e3:.3f} ms', file=sys.stderr)
+    for i in matches:
+      print(f'  {airfields.describe(i)}  {airfields.elevation_ft[i]:.0f} ft  {airfields.runways(i)}')
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,152 @@
+# precomputed MinGo over the app's whole discrete input space: every degree, every 100 ft of field elevation,
+# every 1000 lbs and every 100 ft of runway on the charts, built offline by build_answer_cube.py. the density
+# ratio over the same temperatures and elevations is the density ratio grid told already maps.
+#
+# the cube is about 43 million answers, so it is stored as zlib compressed chunks, each one field elevation
+# by chunk_temps temperatures by every weight and runway length, with MinGo in hundredths as int16 (missing
+# for off the chart). the layout is
+#
+#   8 bytes   magic b'TOLDCUBE'
+#   4 bytes   header length, little endian uint32
+#   header    utf-8 json: schema_version, chart_data_hash, the axes as [first, step, count] and chunk_temps
+#   index     chunks + 1 little endian uint64 offsets of the chunks from the start of the data
+#   data      the compressed chunks
+#
+# AnswerCube maps the file and decompresses a chunk only when a lookup lands in it, keeping the most recent
+# max_chunks chunks in an LRU, so lookups are table reads and memory stays bounded.
+#
+# told_server.py answers batches from it. the app does not: its MAX/Dry answer shows the density ratio and the
+# curve charts, so the pipeline stages before the runway run anyway, and a single scalar lookup (~35 us with
+# its chunk cached, a decompression when not) costs more than interpolate_runway (~30 us) it would replace.
+# repeat questions are served by the shared result cache instead
+import collections
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+import told
+
+MAGIC = b'TOLDCUBE'
+# 2: MinGo off the charts only for the -1 cells of the charts the blend gives weight to
+SCHEMA_VERSION = 2
+# cube axes in storage order, the last two make up every chunk
+axis_names = ('alt', 'temp', 'weight', 'runway_length')
+# MinGo is stored in hundredths, the precision the app shows it at
+scale = 100
+missing = np.iinfo(np.int16).min
+default_path = os.path.join(told.data_dir, f'answer_cube-{told.chart_data_hash[:12]}.bin')
+
+def cube_axes():
+  # [first, step, count] of every axis: the density ratio grid's elevations and temperatures, and the weights
+  # and runway lengths on the charts at the app's input steps
+  return {
+    'alt': [int(told.grid_altitudes[0]), told.grid_altitude_step, len(told.grid_altitudes)],
+    'temp': [int(told.grid_temps[0]), 1, len(told.grid_temps)],
+    'weight': [int(told.weights[0]), 1000, int((told.weights[-1] - told.weights[0])//1000) + 1],
+    'runway_length': [int(told.runway_lengths_array[0]), 100, int((told.runway_lengths_array[-1] - told.runway_lengths_array[0])//100) + 1],
+  }
+
+def axis_values(axis):
+  first, step, count = axis
+  return first + step*np.arange(count)
+
+def encode(min_go):
+  # MinGo as int16 hundredths, missing where it is nan
+  return np.where(np.isnan(min_go), missing, np.round(np.nan_to_num(min_go)*scale)).astype('<i2')
+
+def write_answer_cube(path, axes, chunk_temps, chunks, chart_data_hash, level=6):
+  # write the cube from its chunks (int16 arrays in chunk order: by elevation, then by chunk_temps
+  # temperatures), returns the file size
+  compressed = [zlib.compress(np.ascontiguousarray(chunk, dtype='<i2').tobytes(), level) for chunk in chunks]
+  index = np.concatenate([[0], np.cumsum([len(data) for data in compressed])]).astype('<u8')
+  header = json.dumps({'schema_version': SCHEMA_VERSION, 'chart_data_hash': chart_data_hash, 'axes': axes, 'chunk_temps': chunk_temps}).encode()
+  # pad the header so the index starts aligned
+  header += b' '*(-(len(MAGIC) + 4 + len(header)) % 8)
+  with open(path, 'wb') as f:
+    f.write(MAGIC + struct.pack('<I', len(header)) + header + index.tobytes())
+    for data in compressed:
+      f.write(data)
+  return os.path.getsize(path)
+
+class AnswerCube:
+  def __init__(self, path, max_chunks=32):
+    with open(path, 'rb') as f:
+      self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if self.buffer[:len(MAGIC)] != MAGIC:
+      raise ValueError(f'{path} is not an answer cube')
+    (header_length,) = struct.unpack_from('<I', self.buffer, len(MAGIC))
+    header = json.loads(bytes(self.buffer[len(MAGIC) + 4:len(MAGIC) + 4 + header_length]))
+    if header['schema_version'] != SCHEMA_VERSION:
+      raise ValueError(f'{path} has schema version {header["schema_version"]}, expected {SCHEMA_VERSION}')
+    self.chart_data_hash = header['chart_data_hash']
+    self.axes = [header['axes'][name] for name in axis_names]
+    self.chunk_temps = header['chunk_temps']
+    self.temp_chunks = -(-self.axes[1][2] // self.chunk_temps)
+    chunk_count = self.axes[0][2]*self.temp_chunks
+    index_offset = len(MAGIC) + 4 + header_length
+    self.index = np.frombuffer(self.buffer, '<u8', chunk_count + 1, index_offset)
+    self.data_offset = index_offset + self.index.nbytes
+    self.max_chunks = max_chunks
+    # chunk number -> decompressed chunk, least recently used first
+    self.chunks = collections.OrderedDict()
+    self.hits = 0
+    self.loads = 0
+    self.lock = threading.Lock()
+
+  def chunk(self, n):
+    # chunk n as a flat int16 array, decompressed on first use and kept while it is among the most recent
+    with self.lock:
+      chunk = self.chunks.get(n)
+      if chunk is not None:
+        self.chunks.move_to_end(n)
+        self.hits += 1
+        return chunk
+    start, stop = self.data_offset + int(self.index[n]), self.data_offset + int(self.index[n+1])
+    chunk = np.frombuffer(zlib.decompress(self.buffer[start:stop]), '<i2')
+    with self.lock:
+      self.loads += 1
+      self.chunks[n] = chunk
+      while len(self.chunks) > self.max_chunks:
+        self.chunks.popitem(last=False)
+    return chunk
+
+  def lookup(self, user_temp, user_alt, user_ac_weight, user_runway_length):
+    # MinGo for arrays of scenarios and a mask of the ones the cube holds, the scenarios on its input steps.
+    # MinGo is nan off the charts and for the scenarios not in the cube
+    inputs = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (user_alt, user_temp, user_ac_weight, user_runway_length)))
+    shape = inputs[0].shape
+    on_cube = np.ones(inputs[0].size, dtype=bool)
+    indices = []
+    for (first, step, count), value in zip(self.axes, inputs):
+      i = (value.ravel() - first)/step
+      on_cube &= (i == np.floor(i)) & (0 <= i) & (i < count)
+      indices.append(i)
+    alt, temp, weight, runway_length = (np.where(on_cube, i, 0).astype(int) for i in indices)
+    chunk_numbers = alt*self.temp_chunks + temp//self.chunk_temps
+    offsets = ((temp % self.chunk_temps)*self.axes[2][2] + weight)*self.axes[3][2] + runway_length
+
+    values = np.full(on_cube.shape, missing, dtype=np.int16)
+    for n in np.unique(chunk_numbers[on_cube]):
+      rows = on_cube & (chunk_numbers == n)
+      values[rows] = self.chunk(n)[offsets[rows]]
+    min_go = np.where(values == missing, np.nan, values/scale)
+    return min_go.reshape(shape), on_cube.reshape(shape)
+
+  def stats(self):
+    with self.lock:
+      return {'chunks_cached': len(self.chunks), 'max_chunks': self.max_chunks, 'chunk_hits': self.hits, 'chunk_loads': self.loads}
+
+def load_answer_cube(path=default_path, max_chunks=32):
+  # the cube built from the current chart data, None when it has not been built or was built by an older schema
+  try:
+    cube = AnswerCube(path, max_chunks)
+  except (FileNotFoundError, ValueError):
+    return None
+  if cube.chart_data_hash != told.chart_data_hash:
+    return None
+  return cube
@@ -0,0 +1,255 @@
+# benchmark suite for the TOLD pipeline. times the app's pipeline stages (density_ratio on and off the
+# precomputed grid, select_min_go_curves, interpolate_runway), loading the chart tables, chart spec
+# construction, the batch engine, answer cube lookups and a full script rerun under streamlit's AppTest
+# harness, using inputs that land in every weight band (34k-66k) and every density ratio band (0.70-1.10),
+# and writes the results as json. the curves are precomputed spline coefficients, so there is
+# no fitting cache and no cold or warm variant of the calculations, e.g.
+#
+#   python bench_told.py --output bench.json
+#   python bench_told.py --baseline bench.json --threshold 0.25
+#
+# with --baseline it exits non-zero when any benchmark's median is more than threshold slower than before.
+# --check-interpolation also sweeps the spline kernel against scipy's interp1d over the full chart domains and
+# exits non-zero when the largest difference is over spline.tolerance, or when the generic chart engine in
+# chart_registry.py differs from told's by as much.
+#
+# the startup benchmarks each run in a fresh python process: importing told, importing the app module, the
+# time to the first MinGo (imports plus the default scenario through the app's pipeline) and the first full
+# AppTest run of the script
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+from scipy import interpolate
+import streamlit.config
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+# calling the app functions outside a streamlit server logs a bare mode warning on every call
+streamlit.config.set_option('logger.level', 'error')
+streamlit.logger.set_log_level('error')
+
+import answer_cube
+import chart_data
+import chart_registry
+import spline
+import streamlit_app
+import told
+
+app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+
+def band_scenarios():
+  # one (temp, alt, weight, runway length) per weight band and density ratio band pair. the weights sit
+  # mid band and the temperature/elevation pairs are the first grid nodes landing in each density ratio band
+  dr_inputs = []
+  temps, alts = np.meshgrid(told.grid_temps, told.grid_altitudes)
+  density_ratio = told.calc_density_ratio_batch(temps, alts)
+  for d in range(1, len(told.density_ratios)):
+    lower, upper = told.density_ratios[d-1], told.density_ratios[d]
+    in_band = ((density_ratio > lower) if d > 1 else (density_ratio >= lower)) & (density_ratio <= upper)
+    row, col = np.argwhere(in_band)[0]
+    dr_inputs.append((int(temps[row, col]), int(alts[row, col]), float(density_ratio[row, col])))
+
+  scenarios = []
+  runway_lengths = [4000, 6500, 8000, 12000]
+  for temp, alt, dr in dr_inputs:
+    for weight in (told.weights[:-1] + told.weights[1:])//2:
+      scenarios.append((temp, alt, dr, int(weight), runway_lengths[len(scenarios) % len(runway_lengths)]))
+  return scenarios
+
+def timed(fn, cases, repeat):
+  # per call timings over repeat passes through all cases, after one untimed warm up pass
+  for case in cases:
+    fn(*case)
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for case in cases:
+      fn(*case)
+    times.append((time.perf_counter() - start)/len(cases))
+  return {'calls': len(cases), 'repeat': repeat, 'median_s': statistics.median(times), 'min_s': min(times), 'mean_s': statistics.fmean(times)}
+
+# fresh process snippets, each printing the seconds it took
+startup_snippets = {
+  'startup_import_told': 'import told',
+  'startup_import_app': 'import streamlit_app',
+  'startup_first_result': 'import streamlit_app; '
+    'values, _ = streamlit_app.told_pipeline.run(dict(temp=60, alt=0, weight=56000, runway_length=8000), {}); '
+    'assert values["runway_interpolation"] is not None',
+  'startup_app_first_run': 'from streamlit.testing.v1 import AppTest; '
+    f'at = AppTest.from_file({app_path!r}, default_timeout=60).run(); assert not at.exception',
+}
+
+def startup_time(snippet):
+  code = f'import time\nstart = time.perf_counter()\n{snippet}\nprint(time.perf_counter() - start)'
+  result = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(app_path), capture_output=True, text=True, check=True)
+  return float(result.stdout.split()[-1])
+
+def bench_startup(runs):
+  # cold start timings over runs fresh processes each
+  results = {}
+  for name, snippet in startup_snippets.items():
+    times = [startup_time(snippet) for _ in range(runs)]
+    results[name] = {'calls': 1, 'repeat': runs, 'median_s': statistics.median(times), 'min_s': min(times), 'mean_s': statistics.fmean(times)}
+  return results
+
+def build_chart_tables():
+  # the per-process chart construction: mapping and hashing the chart data file
+  chart_data.load_chart_data(told.chart_data_path)
+
+def run_benchmarks(repeat, app_runs, startup_runs):
+  scenarios = band_scenarios()
+  dr_cases = [(told.density_ratio_band(alt), temp, alt) for temp, alt, _, _, _ in scenarios]
+  off_grid_cases = [(told.density_ratio_band(alt), temp + 0.5, alt) for temp, alt, _, _, _ in scenarios]
+  curve_cases = [(weight, dr) for _, _, dr, weight, _ in scenarios]
+  runway_cases = [(streamlit_app.select_min_go_curves(weight, dr), runway_length) for _, _, dr, weight, runway_length in scenarios]
+  min_go_cases = [told.min_go_bands(weight, dr) + (runway_length,) for _, _, dr, weight, runway_length in scenarios]
+
+  def charts(weight_band, ratio_weight, density_ratio_band, ratio_2, runway_length):
+    streamlit_app.min_go_chart.__wrapped__(weight_band, ratio_weight, density_ratio_band, streamlit_app.chart_point_budget, told.chart_data_hash)
+
+  batch = np.array([(temp, alt, weight, runway_length) for temp, alt, _, weight, runway_length in scenarios]*200, dtype=float).T
+
+  results = {
+    'density_ratio_grid': timed(streamlit_app.density_ratio, dr_cases, repeat),
+    'density_ratio_interpolated': timed(streamlit_app.density_ratio, off_grid_cases, repeat),
+    'select_min_go_curves': timed(streamlit_app.select_min_go_curves, curve_cases, repeat),
+    'interpolate_runway': timed(streamlit_app.interpolate_runway, runway_cases, repeat),
+    'chart_tables': timed(build_chart_tables, [()], repeat*10),
+    'chart_specs_uncached': timed(charts, min_go_cases, repeat),
+  }
+  batch_stats = timed(told.calc_told_batch, [batch], repeat)
+  results['calc_told_batch_per_row'] = {key: value/batch.shape[1] if key.endswith('_s') else value for key, value in batch_stats.items()}
+  results['calc_told_batch_per_row']['calls'] = batch.shape[1]
+  # the same scenarios read from the answer cube, when it has been built
+  cube = answer_cube.load_answer_cube()
+  if cube is not None:
+    cube_stats = timed(cube.lookup, [batch], repeat)
+    results['answer_cube_lookup_per_row'] = {key: value/batch.shape[1] if key.endswith('_s') else value for key, value in cube_stats.items()}
+    results['answer_cube_lookup_per_row']['calls'] = batch.shape[1]
+  results['app_rerun'] = bench_app(scenarios[:app_runs] if app_runs else scenarios, repeat)
+  if startup_runs:
+    results.update(bench_startup(startup_runs))
+  return results
+
+def bench_app(scenarios, repeat):
+  # full end to end script runs, changing every input between runs like a user would
+  # only the open tab is computed, so open the MAX/Dry answer first. every pass moves the runway 1 ft further
+  # out, so no run is answered from the process wide result cache the passes before it filled
+  at = AppTest.from_file(app_path, default_timeout=60)
+  at.session_state['tab'] = chart_registry.min_go_max_dry.tab
+  at.run()
+  calls = iter(range(sys.maxsize))
+  def rerun(temp, alt, dr, weight, runway_length):
+    runway_length += next(calls)//len(scenarios)
+    for widget, value in zip(at.number_input, (temp, alt, weight, runway_length)):
+      widget.set_value(value)
+    at.run()
+    if at.exception:
+      raise RuntimeError(at.exception[0].message)
+  return timed(rerun, scenarios, repeat)
+
+def interpolation_error():
+  # largest absolute difference between the spline kernel and interp1d(kind='quadratic', fill_value='extrapolate')
+  # for every blended curve the app can build: every 10 ft of field elevation over every 0.1 F, 10 F past
+  # both ends of the chart, and every 100 lbs of weight at every density ratio band over every 10 ft of runway,
+  # 1000 ft past both ends
+  def reference(x, y, queries):
+    return interpolate.interp1d(x, y, kind='quadratic', fill_value='extrapolate')(queries)
+
+  temps = np.arange(told.dr_temp_x_input_tendegrees[0] - 10, told.dr_temp_x_input_tendegrees[-1] + 10.05, 0.1)
+  density_ratio_error = 0
+  for user_alt in np.arange(told.altitudes[0], told.altitudes[-1] + 1, 10):
+    altitude_band = told.density_ratio_band(user_alt)
+    error = np.abs(told.density_ratio_spline(*altitude_band)(temps) - reference(told.dr_temp_x_input_tendegrees, told.blend_density_ratio_curve(*altitude_band), temps))
+    density_ratio_error = max(density_ratio_error, error.max())
+
+  # every MinGo row is fitted through its real cells only, from its -1 cell boundary on, and the rows are blended
+  runway_lengths = np.arange(told.runway_lengths_array[0] - 1000, told.runway_lengths_array[-1] + 1001, 10)
+  rows = {}
+  for w, d in np.ndindex(told.runway_boundary.shape):
+    first = told.runway_boundary[w, d]
+    rows[w, d] = reference(told.runway_lengths_array[first:], told.min_go_tensor[w, d, first:], runway_lengths)
+  min_go_error = 0
+  for user_ac_weight in np.arange(told.weights[0] + 100, told.weights[-1] + 1, 100):
+    for d in range(1, len(told.density_ratios)):
+      w, ratio_weight = told.min_go_bands(user_ac_weight, told.density_ratios[d])[:2]
+      splines = told.min_go_splines(w, ratio_weight, d)
+      for kernel, row in zip(splines, (d-1, d)):
+        error = np.abs(kernel(runway_lengths) - ((1-ratio_weight)*rows[w-1, row] + ratio_weight*rows[w, row]))
+        min_go_error = max(min_go_error, error.max())
+  return {'tolerance': spline.tolerance, 'density_ratio_max_abs_error': float(density_ratio_error), 'min_go_max_abs_error': float(min_go_error)}
+
+def registry_error():
+  # the generic chart engine against told's specialized one for the charts on both, over the band scenarios
+  # and the same points half a step off every input. the density ratio grid rounds a few .xx5 ties the other
+  # way, so the density ratio is compared off the grid
+  scenarios = np.array([(temp, alt, weight, runway_length) for temp, alt, _, weight, runway_length in band_scenarios()], dtype=float)
+  temp, alt, weight, runway_length = np.concatenate([scenarios, scenarios + [0.5, 50, 500, 50]]).T
+  density_ratio = chart_registry.evaluate(chart_registry.density_ratio, alt + 0.5, temp + 0.5)
+  density_ratio_error = np.nanmax(np.abs(density_ratio - told.calc_density_ratio_batch(temp + 0.5, alt + 0.5)))
+  min_go = chart_registry.evaluate(chart_registry.min_go_max_dry, weight, density_ratio, runway_length)
+  expected = told.calc_min_go_batch(density_ratio, weight, runway_length)
+  return {
+    'density_ratio_max_abs_error': float(density_ratio_error), 'min_go_max_abs_error': float(np.nanmax(np.abs(min_go - expected))),
+    'off_chart_mismatches': int((np.isnan(min_go) != np.isnan(expected)).sum()),
+  }
+
+def regressions(results, baseline, threshold):
+  # benchmarks whose median slowed down by more than threshold against the baseline results
+  slower = []
+  for name, stats in results.items():
+    before = baseline.get(name)
+    if before and stats['median_s'] > before['median_s']*(1 + threshold):
+      slower.append((name, before['median_s'], stats['median_s']))
+  return slower
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmark the TOLD calculations and a full app rerun.')
+  parser.add_argument('--output', help='write the results as json to this file')
+  parser.add_argument('--baseline', help='earlier results json to compare against')
+  parser.add_argument('--threshold', type=float, default=0.25, help='allowed fractional slowdown against the baseline (default 0.25)')
+  parser.add_argument('--repeat', type=int, default=5, help='passes over the scenarios per benchmark (default 5)')
+  parser.add_argument('--app-runs', type=int, default=0, help='limit the AppTest reruns to this many scenarios (default all 64)')
+  parser.add_argument('--startup-runs', type=int, default=3, help='fresh processes per startup benchmark, 0 to skip them (default 3)')
+  parser.add_argument('--check-interpolation', action='store_true', help='check the spline kernel against interp1d over the full chart domains')
+  args = parser.parse_args(argv)
+
+  results = run_benchmarks(args.repeat, args.app_runs, args.startup_runs)
+  report = {'python': platform.python_version(), 'numpy': np.__version__, 'benchmarks': results}
+  if args.check_interpolation:
+    report['interpolation'] = interpolation_error()
+    report['interpolation']['registry'] = registry_error()
+  text = json.dumps(report, indent=2)
+  if args.output:
+    with open(args.output, 'w') as f:
+      f.write(text + '\n')
+  print(text)
+
+  if args.baseline:
+    with open(args.baseline) as f:
+      baseline = json.load(f)['benchmarks']
+    slower = regressions(results, baseline, args.threshold)
+    for name, before, after in slower:
+      print(f'REGRESSION {name}: {before*1e3:.3f} ms -> {after*1e3:.3f} ms', file=sys.stderr)
+    if slower:
+      sys.exit(1)
+
+  if args.check_interpolation:
+    check = report['interpolation']
+    if max(check['density_ratio_max_abs_error'], check['min_go_max_abs_error']) > check['tolerance']:
+      print(f'INTERPOLATION spline kernel differs from interp1d by more than {check["tolerance"]}', file=sys.stderr)
+      sys.exit(1)
+    registry = check['registry']
+    if max(registry['density_ratio_max_abs_error'], registry['min_go_max_abs_error']) > check['tolerance'] or registry['off_chart_mismatches']:
+      print(f'INTERPOLATION generic chart engine differs from told by more than {check["tolerance"]}', file=sys.stderr)
+      sys.exit(1)
+
+if __name__ == '__main__':
+  main()
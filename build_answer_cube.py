@@ -0,0 +1,52 @@
+# offline build step for the answer cube (answer_cube.py): evaluates the batch engine, which matches the
+# app's density_ratio and interpolate_runway exactly, over every input the app's number inputs can step to
+# on the charts and writes it chunk by chunk. rerun it after build_chart_data.py and build_density_ratio_grid.py,
+# the cube is only used while its chart data hash matches, e.g.
+#
+#   python build_answer_cube.py --check 100000
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import answer_cube
+import told
+
+def cube_chunks(axes, chunk_temps):
+  # the chunks in file order, MinGo over one elevation, chunk_temps temperatures and every weight and runway length
+  alts, temps, weights, runway_lengths = (answer_cube.axis_values(axes[name]) for name in answer_cube.axis_names)
+  for user_alt in alts:
+    for start in range(0, len(temps), chunk_temps):
+      user_temp, user_ac_weight, user_runway_length = np.meshgrid(temps[start:start+chunk_temps], weights, runway_lengths, indexing='ij')
+      yield answer_cube.encode(told.calc_told_batch(user_temp, user_alt, user_ac_weight, user_runway_length)[1])
+
+def check(cube, samples, seed=0):
+  # scenarios drawn from the cube's inputs whose lookup differs from the engine rounded to hundredths
+  rng = np.random.default_rng(seed)
+  inputs = [rng.choice(answer_cube.axis_values(axis), samples) for axis in cube.axes]
+  user_alt, user_temp, user_ac_weight, user_runway_length = inputs
+  min_go, on_cube = cube.lookup(user_temp, user_alt, user_ac_weight, user_runway_length)
+  expected = np.round(told.calc_told_batch(user_temp, user_alt, user_ac_weight, user_runway_length)[1], 2)
+  return int((~on_cube | ((min_go != expected) & ~(np.isnan(min_go) & np.isnan(expected)))).sum())
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Precompute MinGo over the whole discrete input space into a chunked, compressed cube.')
+  parser.add_argument('--output', default=answer_cube.default_path, help='cube file (default data/answer_cube-<chart data hash>.bin)')
+  parser.add_argument('--chunk-temps', type=int, default=16, help='temperatures per chunk (default 16)')
+  parser.add_argument('--check', type=int, default=0, help='compare this many random lookups against the engine after writing')
+  args = parser.parse_args(argv)
+
+  start = time.perf_counter()
+  axes = answer_cube.cube_axes()
+  size = answer_cube.write_answer_cube(args.output, axes, args.chunk_temps, cube_chunks(axes, args.chunk_temps), told.chart_data_hash)
+  cells = np.prod([axis[2] for axis in axes.values()])
+  print(f'wrote {cells:,} answers to {args.output} ({size/(1 << 20):.1f} MB, {cells*2/size:.0f}x compressed) in {time.perf_counter() - start:.1f} s')
+  if args.check:
+    mismatches = check(answer_cube.AnswerCube(args.output), args.check)
+    print(f'{mismatches} of {args.check} random lookups differ from the engine')
+    if mismatches:
+      sys.exit(1)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,53 @@
+# offline build step for data/pcl_charts.bin, the binary chart tables the app loads at startup. the charts
+# are edited in data/pcl_charts.json, laid out like the PCL: one density ratio curve per field elevation
+# over the 10 degree temperature grid, and one MinGo chart per gross weight with a row per density ratio
+# and a column per runway length (-1 where the chart has no value). the quadratic spline coefficients of
+# every curve are fitted here too, so the app never needs scipy to start. rerun it, then
+# build_density_ratio_grid.py, whenever the json changes:
+#
+#   python build_chart_data.py
+import json
+import os
+
+import numpy as np
+
+import chart_data
+import spline
+
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+source_path = os.path.join(data_dir, 'pcl_charts.json')
+chart_data_path = os.path.join(data_dir, 'pcl_charts.bin')
+
+def chart_arrays(source):
+  # the lookup arrays told uses, with every axis ascending
+  density_ratio = source['density_ratio']
+  altitudes = sorted(density_ratio['curves'], key=int)
+
+  min_go = source['min_go']
+  weights = sorted(min_go['charts'], key=int)
+  # the charts list their rows by descending density ratio, flip them so the axis ascends
+  order = np.argsort(min_go['density_ratios'])
+  arrays = {
+    'dr_temps': np.array(density_ratio['temps'], dtype=np.int64),
+    'altitudes': np.array([int(altitude) for altitude in altitudes], dtype=np.int64),
+    'dr_curves': np.array([density_ratio['curves'][altitude] for altitude in altitudes], dtype=float),
+    'weights': np.array([int(weight) for weight in weights], dtype=np.int64),
+    'density_ratios': np.array(min_go['density_ratios'], dtype=float)[order],
+    'runway_lengths': np.array(min_go['runway_lengths'], dtype=np.int64),
+    # (weight, density_ratio, runway_length)
+    'min_go': np.array([np.array(min_go['charts'][weight], dtype=float)[order] for weight in weights]),
+  }
+  # (..., pieces, 3) spline coefficients of every curve over their shared breakpoints
+  arrays['dr_breaks'], arrays['dr_coefficients'] = spline.fit_coefficients(arrays['dr_temps'], arrays['dr_curves'])
+  # every MinGo row is fitted from its first real cell on, the -1 cells before it are not speeds (told checks
+  # that they only ever lead a row)
+  off_chart = arrays['min_go'] == -1
+  first = np.where(off_chart.all(axis=2), off_chart.shape[2], off_chart.argmin(axis=2))
+  arrays['min_go_breaks'], arrays['min_go_coefficients'] = spline.fit_coefficients(arrays['runway_lengths'], arrays['min_go'], first)
+  return arrays
+
+if __name__ == "__main__":
+  with open(source_path) as f:
+    arrays = chart_arrays(json.load(f))
+  sha256 = chart_data.write_chart_data(chart_data_path, arrays, meta={'source': os.path.basename(source_path)})
+  print(f'wrote {chart_data_path} ({os.path.getsize(chart_data_path)} bytes, sha256 {sha256})')
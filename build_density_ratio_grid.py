@@ -0,0 +1,24 @@
+# offline build step for the dense density ratio grid the app memory-maps at startup. it evaluates the
+# blended quadratic interpolation with scipy's interp1d at every degree and every 100 ft of field elevation.
+# the app's spline kernel matches interp1d to spline.tolerance, but a value sitting on a .xx5 rounding tie
+# can round either way, so the grid keeps interp1d as the reference and reads as it always has. rerun it
+# whenever the density ratio chart data in data/pcl_charts.json changes:
+#
+#   python build_density_ratio_grid.py
+import numpy as np
+from scipy import interpolate
+
+import told
+
+def build_density_ratio_grid():
+  grid = np.empty((len(told.grid_altitudes), len(told.grid_temps)))
+  for row, user_alt in enumerate(told.grid_altitudes):
+    interp_y = told.blend_density_ratio_curve(*told.density_ratio_band(user_alt))
+    dr = interpolate.interp1d(told.dr_temp_x_input_tendegrees, interp_y, kind='quadratic', fill_value='extrapolate')
+    grid[row] = np.round(dr(told.grid_temps), 2)
+  return grid
+
+if __name__ == "__main__":
+  grid = build_density_ratio_grid()
+  np.save(told.density_ratio_grid_path, grid)
+  print(f'wrote {grid.shape[0]}x{grid.shape[1]} density ratio grid to {told.density_ratio_grid_path}')
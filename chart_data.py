@@ -0,0 +1,75 @@
+# compact binary container for the PCL chart tables. the layout is
+#
+#   8 bytes   magic b'TOLDCHRT'
+#   4 bytes   header length, little endian uint32
+#   header    utf-8 json: schema_version, sha256, meta and for every array its dtype, shape and offset
+#   data      the raw array bytes, each array starting on an 8 byte boundary
+#
+# the sha256 covers the array table and the data section, so it changes whenever any chart value does.
+# load_chart_data maps the file read-only and hands back numpy views straight onto the mapping, so the
+# tables are never copied and every process serving the app shares one page-cache copy.
+import hashlib
+import json
+import mmap
+import struct
+
+import numpy as np
+
+MAGIC = b'TOLDCHRT'
+SCHEMA_VERSION = 1
+_ALIGN = 8
+
+class ChartData:
+  def __init__(self, arrays, sha256, meta):
+    self.arrays = arrays
+    self.sha256 = sha256
+    self.meta = meta
+
+  def __getitem__(self, name):
+    return self.arrays[name]
+
+def _content_hash(table, data):
+  digest = hashlib.sha256(json.dumps(table, sort_keys=True).encode())
+  digest.update(data)
+  return digest.hexdigest()
+
+def write_chart_data(path, arrays, meta=None):
+  # write a dict of name -> array to path, returns the content hash
+  table, chunks, offset = {}, [], 0
+  for name, array in arrays.items():
+    array = np.ascontiguousarray(array)
+    array = array.astype(array.dtype.newbyteorder('<'))
+    table[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+    padding = -array.nbytes % _ALIGN
+    chunks.append(array.tobytes() + b'\0'*padding)
+    offset += array.nbytes + padding
+  data = b''.join(chunks)
+  sha256 = _content_hash(table, data)
+
+  header = json.dumps({'schema_version': SCHEMA_VERSION, 'sha256': sha256, 'meta': meta or {}, 'arrays': table}).encode()
+  # pad the header so the data section starts aligned
+  header += b' '*(-(len(MAGIC) + 4 + len(header)) % _ALIGN)
+  with open(path, 'wb') as f:
+    f.write(MAGIC + struct.pack('<I', len(header)) + header + data)
+  return sha256
+
+def load_chart_data(path, verify=True):
+  # map the file read-only and return its arrays as zero-copy read-only views
+  with open(path, 'rb') as f:
+    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+  if buffer[:len(MAGIC)] != MAGIC:
+    raise ValueError(f'{path} is not a chart data file')
+  header_length, = struct.unpack_from('<I', buffer, len(MAGIC))
+  data_start = len(MAGIC) + 4 + header_length
+  header = json.loads(bytes(buffer[len(MAGIC) + 4:data_start]))
+  if header['schema_version'] != SCHEMA_VERSION:
+    raise ValueError(f'{path} has chart data schema version {header["schema_version"]}, expected {SCHEMA_VERSION}')
+  if verify and _content_hash(header['arrays'], buffer[data_start:]) != header['sha256']:
+    raise ValueError(f'{path} does not match its content hash')
+
+  arrays = {}
+  for name, spec in header['arrays'].items():
+    dtype = np.dtype(spec['dtype'])
+    count = int(np.prod(spec['shape'], dtype=int))
+    arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + spec['offset']).reshape(spec['shape'])
+  return ChartData(arrays, header['sha256'], header['meta'])
@@ -0,0 +1,119 @@
+# registry of the PCL charts the app can read. a chart declares its table in the chart data, the axes the
+# table is laid out on and the input each axis reads, and is evaluated by one shared engine: linear blends
+# between the chart nodes on every axis but the last, and the chart's fitted quadratic splines along the last.
+# an input can be another chart's output (MinGo reads the density ratio), and is computed first.
+#
+# adding a chart (wet runway, MIL thrust, rotation or refusal speed) is its tables in data/pcl_charts.json and
+# build_chart_data.py, and a register() call here. a chart with a tab gets one in the app, computed only when
+# the tab is open, and is skipped while its tables are missing from the chart data
+import numpy as np
+
+import spline
+import told
+
+class Axis:
+  def __init__(self, table, input, include_first=True):
+    # table: the axis values in the chart data, input: the user input or chart output read along it
+    # include_first: whether the first node is on the chart, as for the _band lookups in told
+    self.table = table
+    self.input = input
+    self.include_first = include_first
+
+class Chart:
+  def __init__(self, name, label, table, axes, breaks, coefficients, tab=None, unit='', digits=None, off_chart_value=None, batch=None):
+    # table: the chart values laid out over the axes, breaks/coefficients: the fitted splines along the last
+    # axis. digits rounds the result like the chart is read, and off_chart_value marks cells with no value.
+    # batch optionally replaces the generic engine with a specialized function of the same inputs
+    self.name = name
+    self.label = label
+    self.table = table
+    self.axes = tuple(axes)
+    self.breaks = breaks
+    self.coefficients = coefficients
+    self.tab = tab
+    self.unit = unit
+    self.digits = digits
+    self.off_chart_value = off_chart_value
+    self.batch = batch
+
+  @property
+  def inputs(self):
+    return tuple(axis.input for axis in self.axes)
+
+  @property
+  def tables(self):
+    return (self.table, self.breaks, self.coefficients) + tuple(axis.table for axis in self.axes)
+
+charts = {}
+
+def register(chart):
+  if chart.name in charts:
+    raise ValueError(f'chart {chart.name} is already registered')
+  charts[chart.name] = chart
+  return chart
+
+def available(chart, data=told.charts):
+  # whether every table the chart reads is in the chart data
+  return all(name in data.arrays for name in chart.tables)
+
+def tab_charts():
+  # the available charts with a tab of their own, in registration order
+  return [chart for chart in charts.values() if chart.tab and available(chart)]
+
+def evaluate(chart, *inputs, data=told.charts):
+  # the chart at arrays of its inputs (in axis order) with the generic engine, nan off the chart
+  inputs = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in inputs))
+  shape = inputs[0].shape
+  inputs = [value.ravel() for value in inputs]
+  table, breaks, coefficients = data[chart.table], data[chart.breaks], data[chart.coefficients]
+  on_chart = np.isfinite(inputs[-1])
+
+  # band and how far through it on every axis but the last
+  bands, ratios = [], []
+  for axis, value in zip(chart.axes[:-1], inputs[:-1]):
+    nodes = data[axis.table]
+    band, axis_on_chart = told.bands(nodes, value, axis.include_first)
+    on_chart &= axis_on_chart
+    bands.append(band)
+    ratios.append((value-nodes[band-1])/(nodes[band]-nodes[band-1]))
+
+  # sum the curves at every corner of the bands, weighted by how close the inputs are to it. a corner with
+  # weight and an off chart cell in the columns either side of the last input (only its own column when it is
+  # on one) takes the scenario off the chart
+  last = data[chart.axes[-1].table]
+  lower = np.clip(np.searchsorted(last, inputs[-1], side='right') - 1, 0, len(last)-1)
+  upper = np.clip(np.searchsorted(last, inputs[-1]), 0, len(last)-1)
+  x = np.where(on_chart, inputs[-1], last[0])
+  result = np.zeros(len(x))
+  rows = np.arange(len(x))
+  for corner in np.ndindex(*(2,)*len(bands)):
+    index = tuple(band - 1 + upper for band, upper in zip(bands, corner))
+    weight = np.prod([ratio if upper else 1-ratio for ratio, upper in zip(ratios, corner)], axis=0)
+    result += weight*spline.evaluate(breaks, coefficients[index], x, rows)
+    if chart.off_chart_value is not None:
+      curves = table[index]
+      on_chart &= (weight <= told.node_tolerance) | ((curves[rows, lower] != chart.off_chart_value) & (curves[rows, upper] != chart.off_chart_value))
+  if chart.digits is not None:
+    result = np.round(result, chart.digits)
+  return np.where(on_chart, result, np.nan).reshape(shape)
+
+def calc_chart(chart, values):
+  # the chart at a dict of user inputs (arrays or scalars), computing the charts it reads first. returns the
+  # values with the output of every chart computed added under its name
+  values = dict(values)
+  for name in chart.inputs:
+    if name not in values:
+      values = calc_chart(charts[name], values)
+  inputs = [values[name] for name in chart.inputs]
+  values[chart.name] = chart.batch(*inputs) if chart.batch is not None else evaluate(chart, *inputs)
+  return values
+
+# the charts the app started with, on the specialized engine in told (the density ratio grid and the -1 cell
+# boundary), which the generic one matches: see bench_told.py --check-interpolation
+density_ratio = register(Chart(
+  'density_ratio', 'Density Ratio', 'dr_curves', [Axis('altitudes', 'alt'), Axis('dr_temps', 'temp')], 'dr_breaks', 'dr_coefficients',
+  digits=2, batch=lambda alt, temp: told.calc_density_ratio_batch(temp, alt)))
+min_go_max_dry = register(Chart(
+  'min_go', 'MinGo', 'min_go', [Axis('weights', 'weight', include_first=False), Axis('density_ratios', 'density_ratio'), Axis('runway_lengths', 'runway_length')],
+  'min_go_breaks', 'min_go_coefficients', tab='MAX/Dry Runway', unit='kts', off_chart_value=-1,
+  batch=lambda weight, density_ratio, runway_length: told.calc_min_go_batch(density_ratio, weight, runway_length)))
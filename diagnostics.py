@@ -0,0 +1,72 @@
+# lightweight per-stage timers for a rerun of the app. each stage records its wall time and the change in
+# allocated memory blocks (sys.getallocatedblocks, which is a counter read and costs next to nothing).
+# a disabled timer hands back one shared no-op stage, so leaving the calls in place costs a function call.
+#
+# set TOLD_DIAGNOSTICS=1 to record every rerun and write it as a json line to stderr, or to the file named
+# by TOLD_DIAGNOSTICS_LOG. the app also records a rerun when the page is opened with ?diagnostics=1 and
+# shows the stages in a panel at the bottom of the page.
+import json
+import os
+import sys
+import threading
+import time
+
+log_enabled = os.environ.get('TOLD_DIAGNOSTICS', '') not in ('', '0')
+log_path = os.environ.get('TOLD_DIAGNOSTICS_LOG')
+_log_lock = threading.Lock()
+
+class _NullStage:
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    return False
+
+_null_stage = _NullStage()
+
+class _Stage:
+  def __init__(self, timer, name):
+    self.timer = timer
+    self.name = name
+
+  def __enter__(self):
+    self.blocks = sys.getallocatedblocks()
+    self.start = time.perf_counter_ns()
+    return self
+
+  def __exit__(self, *exc):
+    elapsed = time.perf_counter_ns() - self.start
+    self.timer.stages.append({'stage': self.name, 'ms': elapsed/1e6, 'alloc_blocks': sys.getallocatedblocks() - self.blocks})
+    return False
+
+class StageTimer:
+  def __init__(self, enabled):
+    self.enabled = enabled
+    self.stages = []
+    # extra fields written with the rerun, like its inputs
+    self.fields = {}
+
+  def stage(self, name):
+    # context manager timing one stage, a shared no-op when the timer is off
+    if not self.enabled:
+      return _null_stage
+    return _Stage(self, name)
+
+  def total_ms(self):
+    return sum(stage['ms'] for stage in self.stages)
+
+  def record(self):
+    # the rerun as one json serializable dict
+    return {'ts': time.time(), **self.fields, 'total_ms': self.total_ms(), 'stages': self.stages}
+
+  def log(self):
+    # write the rerun as a json line for the log pipeline
+    if not (self.enabled and log_enabled and self.stages):
+      return
+    line = json.dumps(self.record()) + '\n'
+    with _log_lock:
+      if log_path:
+        with open(log_path, 'a') as f:
+          f.write(line)
+      else:
+        sys.stderr.write(line)
@@ -0,0 +1,181 @@
+# load test for one app process: drives concurrent simulated sessions through streamlit's AppTest harness,
+# every session in its own thread rerunning the script with random inputs on the app's input steps, like users
+# sharing one server. each concurrency level reports throughput (reruns per second), rerun latency percentiles
+# and how much the process's resident memory grew per session, e.g.
+#
+#   python load_test.py --sessions 1,4,16 --reruns 20 --output load.json
+#   python load_test.py --sessions 1,4,16 --baseline load.json --threshold 0.25
+#
+# with --baseline it exits non-zero when any level's p95 is more than threshold slower than before. the levels
+# run one after another in the same process, so the first one also pays for the shared caches filling up and
+# the memory of each level is measured against the process before its sessions were created.
+#
+# the sessions share the process's caches and GIL as they would under `streamlit run`, but AppTest skips the
+# websocket and browser, so latencies are the script's own rerun time under contention
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+import streamlit.config
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+# AppTest logs a bare mode warning for every session
+streamlit.config.set_option('logger.level', 'error')
+streamlit.logger.set_log_level('error')
+
+import chart_registry
+import told
+
+app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+percentiles = (50, 95, 99)
+
+def rss_bytes():
+  # resident set size of this process, the peak on platforms without /proc
+  try:
+    with open('/proc/self/statm') as f:
+      return int(f.read().split()[1])*os.sysconf('SC_PAGE_SIZE')
+  except (FileNotFoundError, ValueError, OSError):
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak*1024
+
+def random_inputs(rng):
+  # (temp, alt, weight, runway length) on the app's input steps, spread over the whole chart domain
+  return (
+    int(rng.integers(told.dr_temp_x_input_tendegrees[0], told.dr_temp_x_input_tendegrees[-1] + 1)),
+    int(rng.integers(told.altitudes[0]//100, told.altitudes[-1]//100 + 1))*100,
+    int(rng.integers(told.weights[0]//1000, told.weights[-1]//1000 + 1))*1000,
+    int(rng.integers(told.runway_lengths_array[0]//100, told.runway_lengths_array[-1]//100 + 1))*100,
+  )
+
+class Session:
+  # one simulated user: an AppTest of the app with its own session state
+  def __init__(self, tabs, seed, timeout):
+    self.tabs = tabs
+    self.rng = np.random.default_rng(seed)
+    self.at = AppTest.from_file(app_path, default_timeout=timeout)
+    self.latencies = []
+    self.errors = []
+
+  def rerun(self):
+    # change every input and open a random tab, then time the script run
+    if self.at.number_input:
+      for widget, value in zip(self.at.number_input, random_inputs(self.rng)):
+        widget.set_value(value)
+    self.at.session_state['tab'] = self.tabs[self.rng.integers(len(self.tabs))]
+    start = time.perf_counter()
+    try:
+      self.at.run()
+    except Exception as e:
+      self.errors.append(repr(e))
+      return
+    self.latencies.append(time.perf_counter() - start)
+    if self.at.exception:
+      self.errors.append(self.at.exception[0].message)
+
+def run_level(sessions, reruns, tabs, seed, timeout):
+  # sessions concurrent sessions each rerunning reruns times after a first run, started together. every session
+  # of every level draws its own inputs, so a level does not replay the cache hits of the one before
+  gc.collect()
+  rss_before = rss_bytes()
+  users = [Session(tabs, [seed, sessions, n], timeout) for n in range(sessions)]
+  start_together = threading.Barrier(sessions)
+  def drive(user):
+    start_together.wait()
+    for _ in range(reruns + 1):
+      user.rerun()
+  threads = [threading.Thread(target=drive, args=(user,)) for user in users]
+  start = time.perf_counter()
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  elapsed = time.perf_counter() - start
+  gc.collect()
+  rss_after = rss_bytes()
+
+  # the first run of every session builds its widgets, it is counted in the throughput but not the latencies
+  latencies = np.array([seconds for user in users for seconds in user.latencies[1:]])
+  runs = sum(len(user.latencies) for user in users)
+  errors = [error for user in users for error in user.errors]
+  result = {
+    'sessions': sessions, 'reruns': runs, 'errors': len(errors), 'elapsed_s': elapsed, 'throughput_per_s': runs/elapsed,
+    'mean_s': float(latencies.mean()) if latencies.size else None,
+    'max_s': float(latencies.max()) if latencies.size else None,
+    'rss_before_mb': rss_before/2**20, 'rss_after_mb': rss_after/2**20,
+    'rss_per_session_mb': (rss_after - rss_before)/2**20/sessions,
+  }
+  for percentile in percentiles:
+    result[f'p{percentile}_s'] = float(np.percentile(latencies, percentile)) if latencies.size else None
+  if errors:
+    result['first_error'] = errors[0]
+  return result
+
+def run_load_test(levels, reruns, tabs, seed=0, timeout=120):
+  return [run_level(sessions, reruns, tabs, seed, timeout) for sessions in levels]
+
+def regressions(results, baseline, threshold):
+  # concurrency levels whose p95 slowed down by more than threshold against the baseline results
+  before_by_sessions = {level['sessions']: level for level in baseline}
+  slower = []
+  for level in results:
+    before = before_by_sessions.get(level['sessions'])
+    if before and before.get('p95_s') and level['p95_s'] and level['p95_s'] > before['p95_s']*(1 + threshold):
+      slower.append((level['sessions'], before['p95_s'], level['p95_s']))
+  return slower
+
+def session_levels(text):
+  levels = [int(value) for value in text.split(',')]
+  if not levels or min(levels) < 1:
+    raise argparse.ArgumentTypeError('session counts must be positive integers')
+  return levels
+
+def main(argv=None):
+  tab_labels = ['Inputs'] + [chart.tab for chart in chart_registry.tab_charts()] + ['Sensitivity', 'Uncertainty', 'Limits', 'Weather', 'Forecast']
+  parser = argparse.ArgumentParser(description='Load test one app process with concurrent simulated sessions.')
+  parser.add_argument('--sessions', type=session_levels, default=[1, 4, 16], help='comma separated concurrent session counts to run (default 1,4,16)')
+  parser.add_argument('--reruns', type=int, default=20, help='reruns per session at each level (default 20)')
+  parser.add_argument('--tab', action='append', choices=tab_labels, help=f'tab each rerun opens, repeat to pick among several at random (default {chart_registry.min_go_max_dry.tab})')
+  parser.add_argument('--seed', type=int, default=0, help='seed of the random inputs (default 0)')
+  parser.add_argument('--timeout', type=float, default=120, help='seconds a single rerun may take (default 120)')
+  parser.add_argument('--output', help='write the results as json to this file')
+  parser.add_argument('--baseline', help='earlier results json to compare against')
+  parser.add_argument('--threshold', type=float, default=0.25, help='allowed fractional p95 slowdown against the baseline (default 0.25)')
+  args = parser.parse_args(argv)
+
+  tabs = args.tab or [chart_registry.min_go_max_dry.tab]
+  results = run_load_test(args.sessions, args.reruns, tabs, args.seed, args.timeout)
+  report = {
+    'python': platform.python_version(), 'numpy': np.__version__, 'cpus': os.cpu_count(), 'chart_data_hash': told.chart_data_hash,
+    'tabs': tabs, 'reruns_per_session': args.reruns, 'seed': args.seed, 'levels': results,
+  }
+  text = json.dumps(report, indent=2)
+  if args.output:
+    with open(args.output, 'w') as f:
+      f.write(text + '\n')
+  print(text)
+  for level in results:
+    p50, p95, p99 = (level[f'p{percentile}_s'] or 0 for percentile in percentiles)
+    print(f"{level['sessions']:>4} sessions  {level['throughput_per_s']:7.1f} reruns/s  p50 {p50*1e3:7.1f} ms  p95 {p95*1e3:7.1f} ms  "
+          f"p99 {p99*1e3:7.1f} ms  {level['rss_per_session_mb']:6.2f} MB/session  {level['errors']} errors", file=sys.stderr)
+
+  failed = any(level['errors'] for level in results)
+  if args.baseline:
+    with open(args.baseline) as f:
+      baseline = json.load(f)['levels']
+    slower = regressions(results, baseline, args.threshold)
+    for sessions, before, after in slower:
+      print(f'REGRESSION {sessions} sessions p95: {before*1e3:.1f} ms -> {after*1e3:.1f} ms', file=sys.stderr)
+    failed = failed or bool(slower)
+  if failed:
+    sys.exit(1)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,47 @@
+# the TOLD calculation as explicit stages with declared inputs. a stage reads named values (user inputs or
+# the outputs of earlier stages) and its output is stored under its own name. each run is compared against
+# the memo of the previous one, and a stage is only recomputed when one of its inputs changed, so editing
+# runway length only reruns the stages downstream of it.
+#
+# a stage returning None means off the charts: every stage reading it is skipped and outputs None too
+class Stage:
+  def __init__(self, name, inputs, fn):
+    self.name = name
+    self.inputs = tuple(inputs)
+    self.fn = fn
+
+class Pipeline:
+  def __init__(self, stages):
+    self.stages = list(stages)
+    names = [stage.name for stage in self.stages]
+    if len(set(names)) != len(names):
+      raise ValueError(f'duplicate stage names in {names}')
+
+  def run(self, values, memo, timer=None):
+    # run the stages over values (a dict of the user inputs), reusing memo entries whose inputs are unchanged.
+    # memo is a dict of stage name -> (inputs, output) kept between runs, updated in place. returns the values
+    # with every stage output added and the names of the stages that were recomputed
+    values = dict(values)
+    recomputed = []
+    for stage in self.stages:
+      inputs = tuple(values[name] for name in stage.inputs)
+      previous = memo.get(stage.name)
+      if previous is not None and _same(previous[0], inputs):
+        values[stage.name] = previous[1]
+        continue
+      if any(value is None for value in inputs):
+        output = None
+      elif timer is None:
+        output = stage.fn(*inputs)
+      else:
+        with timer.stage(stage.name):
+          output = stage.fn(*inputs)
+      memo[stage.name] = (inputs, output)
+      values[stage.name] = output
+      recomputed.append(stage.name)
+    return values, recomputed
+
+def _same(a, b):
+  # input tuples are equal when every value is the same object or compares equal; cached objects like the
+  # interpolators are shared, so an unchanged one is the same object
+  return len(a) == len(b) and all(x is y or (type(x) is type(y) and x == y) for x, y in zip(a, b))
@@ -0,0 +1,82 @@
+# process wide cache of TOLD results shared by every session of the app and every request to told_server.py.
+# a squadron asks the same server about the same fields at similar temperatures and standard weights, so
+# results are keyed on the inputs quantized to the app's input steps plus the chart data hash, held in a
+# bounded LRU whose entries also expire after a ttl, and counted (hits, misses, evictions, expirations) so
+# the load taken off the interpolation path can be checked
+import collections
+import threading
+import time
+
+# input name -> step of the app's number inputs
+input_steps = {'temp': 1, 'alt': 100, 'weight': 1000, 'runway_length': 100}
+
+def quantize(name, value):
+  # a value on its input step as that step multiple, so 60, 60.0 and 60.0000000001 share a key. values between
+  # steps (a typed in or looked up field elevation) key on themselves, a result is never reused for other inputs
+  step = input_steps[name]
+  snapped = round(value/step)*step
+  return snapped if abs(value - snapped) <= 1e-9*step else float(value)
+
+def told_key(chart_data_hash, inputs):
+  # cache key of a dict of the app inputs computed from the given chart data
+  return (chart_data_hash,) + tuple(quantize(name, inputs[name]) for name in input_steps)
+
+class ResultCache:
+  # thread safe LRU of key -> result with an optional time to live (seconds) for every entry
+  def __init__(self, max_entries, ttl=None, clock=time.monotonic):
+    self.max_entries = max_entries
+    self.ttl = ttl
+    self.clock = clock
+    # key -> (expiry time or None, result), least recently used first
+    self.entries = collections.OrderedDict()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+    self.lock = threading.Lock()
+
+  def get(self, key):
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is not None and entry[0] is not None and entry[0] <= self.clock():
+        del self.entries[key]
+        self.expirations += 1
+        entry = None
+      if entry is None:
+        self.misses += 1
+        return None
+      self.entries.move_to_end(key)
+      self.hits += 1
+      return entry[1]
+
+  def put(self, key, result):
+    if self.max_entries <= 0:
+      return
+    with self.lock:
+      self.entries[key] = (None if self.ttl is None else self.clock() + self.ttl, result)
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.max_entries:
+        self.entries.popitem(last=False)
+        self.evictions += 1
+
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
+
+  def stats(self):
+    with self.lock:
+      lookups = self.hits + self.misses
+      return {'entries': len(self.entries), 'max_entries': self.max_entries, 'ttl_s': self.ttl, 'hits': self.hits, 'misses': self.misses,
+              'evictions': self.evictions, 'expirations': self.expirations, 'hit_rate': self.hits/lookups if lookups else None}
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def shared_cache(max_entries, ttl=None):
+  # the one cache of this size and ttl in the process. the app gets its cache here rather than from
+  # st.cache_resource, whose entries are keyed on the script's module and so cannot be reached (or warmed, see
+  # warmup.py) from outside the script run
+  with _shared_lock:
+    if (max_entries, ttl) not in _shared:
+      _shared[max_entries, ttl] = ResultCache(max_entries, ttl)
+    return _shared[max_entries, ttl]
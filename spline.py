@@ -0,0 +1,72 @@
+# quadratic spline kernel for the chart curves. a curve is fitted once with the same quadratic interpolating
+# spline interp1d(kind='quadratic', fill_value='extrapolate') uses, and kept as the coefficients of each
+# piece in local form c0*dx**2 + c1*dx + c2, dx = x - breaks[piece]. evaluating is a searchsorted for the
+# piece and two multiply-adds, for scalars and arrays alike, with the end pieces extended to extrapolate.
+#
+# fitting is linear in the curve values, so the coefficients of a blend of two curves are the same blend of
+# their coefficients. a MinGo chart row is fitted only through its real cells, never through the -1 cells
+# marking where the chart has no value. the charts are fitted once by build_chart_data.py and stored with the
+# chart data, so no curve is fitted at startup or per query and only fitting needs scipy.
+# the results match interp1d to within tolerance (absolute), see bench_told.py --check-interpolation
+import numpy as np
+
+# largest absolute difference from interp1d over the chart domains
+tolerance = 1e-9
+
+def fit_coefficients(x, ys, first=None):
+  # breakpoints and (..., pieces, 3) coefficients of the quadratic splines through every curve in ys, curves
+  # along the last axis. with first, an index into x per curve, each curve is fitted only through its points
+  # from x[first] on (interp1d over x[first:], extrapolating below it) and every curve is laid out over the
+  # union of their breakpoints, so blends of curves are still blends of coefficients
+  from scipy import interpolate
+
+  ys = np.asarray(ys, dtype=float)
+  if first is None:
+    spline = interpolate.make_interp_spline(x, np.moveaxis(ys, -1, 0), k=2)
+    breaks = np.unique(spline.t)
+    left = breaks[:-1]
+    coefficients = np.stack([spline(left, 2)/2, spline(left, 1), spline(left)], axis=-1)
+    # (pieces, ..., 3) -> (..., pieces, 3)
+    return breaks, np.ascontiguousarray(np.moveaxis(coefficients, 0, -2))
+
+  x = np.asarray(x, dtype=float)
+  first = np.broadcast_to(first, ys.shape[:-1])
+  splines = {}
+  for index in np.ndindex(first.shape):
+    points = len(x) - first[index]
+    if points > 0:
+      # fewer than three points take the highest degree they can, as interp1d would refuse them
+      splines[index] = interpolate.make_interp_spline(x[first[index]:], ys[index][first[index]:], k=min(2, points-1))
+  breaks = np.unique(np.concatenate([x[[0, -1]]] + [spline.t for spline in splines.values()]))
+  left = breaks[:-1]
+  # curves with no points at all are left at zero, they are off the chart everywhere
+  coefficients = np.zeros(ys.shape[:-1] + (len(left), 3))
+  for index, spline in splines.items():
+    coefficients[index] = np.stack([spline(left, nu)/(2 if nu == 2 else 1) if nu <= spline.k else np.zeros(len(left)) for nu in (2, 1, 0)], axis=-1)
+  return breaks, coefficients
+
+def piece_index(breaks, queries):
+  # piece holding every query, the first and last pieces taking everything past the ends
+  return np.clip(np.searchsorted(breaks, queries, 'right') - 1, 0, len(breaks) - 2)
+
+def evaluate(breaks, coefficients, queries, rows=None):
+  # value of the piecewise quadratic with (pieces, 3) coefficients at queries, or with rows the value of
+  # curve rows[n] of (curves, pieces, 3) coefficients at queries[n]
+  queries = np.asarray(queries, dtype=float)
+  piece = piece_index(breaks, queries)
+  c = coefficients[piece] if rows is None else coefficients[rows, piece]
+  dx = queries - breaks[piece]
+  return (c[..., 0]*dx + c[..., 1])*dx + c[..., 2]
+
+class QuadraticSpline:
+  # callable piecewise quadratic, a drop in for the interp1d objects the app used
+  def __init__(self, breaks, coefficients):
+    self.breaks = breaks
+    self.coefficients = coefficients
+
+  @classmethod
+  def fit(cls, x, y):
+    return cls(*fit_coefficients(x, y))
+
+  def __call__(self, queries):
+    return evaluate(self.breaks, self.coefficients, queries)
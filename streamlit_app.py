@@ -1,92 +1,342 @@
-import pandas as pd
+# pandas, altair and pyarrow (airfields) take over a second to import between them and the core answer needs
+# none of them, so the functions drawing charts and tables import them on first use
 import streamlit as st
 import numpy as np
-from scipy import interpolate
-import altair as alt
+import math
+import os
+import chart_registry
+import diagnostics
+import pipeline
+import result_cache
+import told
+import told_montecarlo
+import wx_forecast
+import wx_ingest
+
+# most points plotted on a chart line, set TOLD_CHART_POINTS to change it
+chart_point_budget = int(os.environ.get('TOLD_CHART_POINTS', 100))
+# OurAirports-style airfield database for the airfield picker, which is hidden when the files are missing
+airports_csv = os.environ.get('TOLD_AIRPORTS_CSV', os.path.join(told.data_dir, 'airports.csv'))
+runways_csv = os.environ.get('TOLD_RUNWAYS_CSV', os.path.join(told.data_dir, 'runways.csv'))
+# METAR/TAF drop directory for the Weather tab and how often it is rescanned (seconds)
+wx_directory = os.environ.get('TOLD_WX_DIR', 'wx')
+wx_scan_seconds = float(os.environ.get('TOLD_WX_SCAN_SECONDS', 30))
+# hourly temperature forecast for the Forecast tab and how often it is rechecked for changes (seconds)
+forecast_file = os.environ.get('TOLD_FORECAST_FILE', 'forecast.csv')
+forecast_scan_seconds = float(os.environ.get('TOLD_FORECAST_SCAN_SECONDS', 30))
+# worker processes for the Monte Carlo mode, one per core unless TOLD_MC_WORKERS is set
+monte_carlo_workers = int(os.environ.get('TOLD_MC_WORKERS', 0)) or told_montecarlo.default_workers()
+# the MAX/Dry results shared by every session (see result_cache.py), TOLD_RESULT_CACHE_SIZE of them kept for
+# TOLD_RESULT_CACHE_TTL seconds (0 for no limit)
+result_cache_size = int(os.environ.get('TOLD_RESULT_CACHE_SIZE', 4096))
+result_cache_ttl = float(os.environ.get('TOLD_RESULT_CACHE_TTL', 3600)) or None
+# weight rows of the sensitivity heatmap, at the weight input's step
+sensitivity_weights = np.arange(told.weights[0], told.weights[-1]+1, 1000)
+
+# the database is parsed once per process and shared by every session, the file stamps reload it when it changes
+@st.cache_resource(max_entries=1, show_spinner='Loading airfields...')
+def get_airfields(airports_path, runways_path, stamp):
+  import airfields
+  return airfields.load_airfields(airports_path, runways_path)
+
+def airfield_files_stamp():
+  # modification times of the database files, None when either is missing
+  try:
+    return os.stat(airports_csv).st_mtime_ns, os.stat(runways_csv).st_mtime_ns
+  except FileNotFoundError:
+    return None
+
+def select_airfield():
+  # pick an airfield and runway, returns their (field elevation, runway length) with None for anything not picked
+  stamp = airfield_files_stamp()
+  if stamp is None:
+    return None, None
+  db = get_airfields(airports_csv, runways_csv, stamp)
+  matches = db.search(st.text_input('Airfield (ICAO or name)', value=''))
+  if not matches:
+    return None, None
+  col1, col2 = st.columns(2)
+  with col1:
+    i = st.selectbox('Airfield', matches, format_func=db.describe)
+  with col2:
+    runway = st.selectbox('Runway', db.runways(i), format_func=lambda runway: f'{runway[0]} ({runway[1]:,} ft)')
+  elevation = db.elevation_ft[i]
+  return (None if np.isnan(elevation) else int(round(float(elevation)))), runway[1]
 
 def get_user_inputs():
+  # a picked airfield fills in the field elevation and runway length
+  airfield_alt, airfield_runway_length = select_airfield()
   col1, col2, col3, col4 = st.columns(4)
   
   # get input from user for temperature and altitude and weight
   with col1:
     user_temp = st.number_input('Enter Temp (F)', value=60, step=1)
   with col2:
-    user_alt = st.number_input('Enter Field Elevation (ft)', value=0, step=100)
+    user_alt = st.number_input('Enter Field Elevation (ft)', value=0 if airfield_alt is None else airfield_alt, step=100)
   with col3:
     user_ac_weight = st.number_input('Enter Aircraft Weight (lbs)', value=56000, step=1000)
   with col4:
-    user_runway_length = st.number_input('Enter Runway Length (ft)', value=8000, step=100)
+    user_runway_length = st.number_input('Enter Runway Length (ft)', value=8000 if airfield_runway_length is None else airfield_runway_length, step=100)
   
   return user_temp, user_alt, user_ac_weight, user_runway_length
 
-def calc_density_ratio(interp_y, dr_temp_x_input_tendegrees, dr_temp_x_input_onedegrees, user_temp):
-   # create the interpolation function based on the combined weighted curve
-  dr = interpolate.interp1d(dr_temp_x_input_tendegrees, interp_y, kind='quadratic', fill_value='extrapolate')
+# the interpolators (told.density_ratio_spline, told.min_go_splines) are blends of chart curves fitted once
+# when told is imported, so building one is two array multiply-adds and needs no cache. the cached chart
+# functions below take told.chart_data_hash so new chart data never hits old entries
+def density_ratio(altitude_band, user_temp, user_alt):
+  # read the density ratio straight from the precomputed grid when the inputs land on one of its nodes
+  density_ratio_calculated = told.grid_density_ratio(user_temp, user_alt)
+  if density_ratio_calculated is None:
+    # the density ratio based on the inputs from the user and the interpolation function
+    dr = told.density_ratio_spline(*altitude_band)
+    density_ratio_calculated = np.round(dr(user_temp),2)
+  return density_ratio_calculated
 
+def select_min_go_curves(user_ac_weight, density_ratio_calculated):
+  # the weight and density ratio bands and the interpolators either side, None when either is off the charts
+  min_go_bands = told.min_go_bands(user_ac_weight, density_ratio_calculated)
+  if min_go_bands is None:
+    return None
+  weight_band, ratio_weight, density_ratio_band, ratio_2 = min_go_bands
+  return min_go_bands + told.min_go_splines(weight_band, ratio_weight, density_ratio_band)
+
+def interpolate_runway(curves, user_runway_length):
+  # MinGo at the runway length, None when the scenario falls in the chart's -1 (off chart) cells, which the
+  # feasibility boundary tells before anything is interpolated
+  weight_band, ratio_weight, density_ratio_band, ratio_2, min_go_interpolated_lower, min_go_interpolated_upper = curves
+  if not told.min_go_feasible(weight_band, ratio_weight, density_ratio_band, ratio_2, user_runway_length):
+    return None
+  return min_go(ratio_2, min_go_interpolated_lower, min_go_interpolated_upper, user_runway_length)
+
+def min_go(ratio_2, min_go_interpolated_lower, min_go_interpolated_upper, user_runway_length):
+  min_go_calculated_lower = min_go_interpolated_lower(user_runway_length)
+  min_go_calculated_upper = min_go_interpolated_upper(user_runway_length)
+  
+  return (1-ratio_2)*min_go_calculated_lower + ratio_2*min_go_calculated_upper
+
+# the TOLD calculation as stages with the inputs each one reads. every session keeps the previous run in
+# st.session_state and a rerun only recomputes the stages downstream of the inputs that changed
+told_pipeline = pipeline.Pipeline([
+  # the altitude band for the field elevation, None when it is off the chart
+  pipeline.Stage('altitude_blend', ['alt'], told.density_ratio_band),
+  pipeline.Stage('density_ratio', ['altitude_blend', 'temp', 'alt'], density_ratio),
+  # the weight and density ratio bands and their curves, None when either is off the charts
+  pipeline.Stage('curve_selection', ['weight', 'density_ratio'], select_min_go_curves),
+  # MinGo at the runway length, None in the -1 (off chart) cells
+  pipeline.Stage('runway_interpolation', ['curve_selection', 'runway_length'], interpolate_runway),
+])
+
+def downsample(x, point_budget):
+  # evenly spaced subset of x with at most point_budget points, always keeping both ends
+  if len(x) <= point_budget:
+    return x
+  return x[np.unique(np.linspace(0, len(x)-1, max(point_budget, 2)).round().astype(int))]
+
+# the chart specs are only built when the charts are shown, and are cached by the same band keys as the
+# interpolators so a repeat view is a cache read
+@st.cache_data(max_entries=256, show_spinner=False)
+def density_ratio_chart(altitude_band, ratio, point_budget, chart_data_hash):
   # create the altair chart of this curve for every degree on the x axis and run though function for plotted values
+  import altair as alt
+  import pandas as pd
+  dr = told.density_ratio_spline(altitude_band, ratio)
+  temps = downsample(told.dr_temp_x_input_onedegrees, point_budget)
   source = pd.DataFrame({
-    'Temp(F)': dr_temp_x_input_onedegrees,
-    'Density Ratio': dr(dr_temp_x_input_onedegrees)
+    'Temp(F)': temps,
+    'Density Ratio': dr(temps)
   })
 
-  c = alt.Chart(source).mark_line().encode(
+  return alt.Chart(source).mark_line().encode(
       x='Temp(F)',
       y='Density Ratio'
-  )
-
- # st.altair_chart(c, use_container_width = True)
-
-  # create the array of interpolated values based on the curve at every degree
-  interp_dr_array = dr(dr_temp_x_input_onedegrees)
-  # output the metric of the density ratio based on the inputs from the user and the interpolation function
-  density_ratio_calculated = np.round(dr(user_temp),2)
-  st.metric('Density Ratio', density_ratio_calculated, delta=None, delta_color="normal")
-  
-  return density_ratio_calculated
-    
-def calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length):
-  # create the interpolation function based on the combined weighted curve
-  min_go_interpolated_lower = interpolate.interp1d(runway_lengths_array, interp_ys_lower_weightcurve, kind='quadratic', fill_value='extrapolate')
-  min_go_interpolated_upper = interpolate.interp1d(runway_lengths_array, interp_ys_upper_weightcurve, kind='quadratic', fill_value='extrapolate')
-
-  mg_interp_array_lower = min_go_interpolated_lower(rwl_expanded)
-  mg_interp_array_upper = min_go_interpolated_upper(rwl_expanded)
-  min_go_calculated_lower = min_go_interpolated_lower(user_runway_length)
-  min_go_calculated_upper = min_go_interpolated_upper(user_runway_length)
-  
-  final_min_go = (1-ratio_2)*min_go_calculated_lower + ratio_2*min_go_calculated_upper
-  
-  st.metric('MinGo', np.round(final_min_go,2), delta=None, delta_color="normal")
-
-  # create the altair chart of this curve for every degree on the x axis and run though function for plotted values
+  ).to_dict()
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def min_go_chart(weight_band, ratio_weight, density_ratio_band, point_budget, chart_data_hash):
+  # create the altair chart of the lower and upper density ratio curves over the runway lengths
+  import altair as alt
+  import pandas as pd
+  min_go_interpolated_lower, min_go_interpolated_upper = told.min_go_splines(weight_band, ratio_weight, density_ratio_band)
+  rwl = downsample(told.rwl_expanded, point_budget)
   source = pd.DataFrame({
-    'RWL': rwl_expanded,
-    'MinGo': min_go_interpolated_lower(rwl_expanded)
+    'RWL': np.concatenate([rwl, rwl]),
+    'MinGo': np.concatenate([min_go_interpolated_lower(rwl), min_go_interpolated_upper(rwl)]),
+    'Density Ratio': np.repeat([f'{told.density_ratios[density_ratio_band-1]:.2f}', f'{told.density_ratios[density_ratio_band]:.2f}'], len(rwl))
   })
 
-  c = alt.Chart(source).mark_line().encode(
+  return alt.Chart(source).mark_line().encode(
       x='RWL',
-      y='MinGo'
-  )
-
- # st.altair_chart(c, use_container_width = True)
-
-  # create the altair chart of this curve for every degree on the x axis and run though function for plotted values
+      y='MinGo',
+      color='Density Ratio'
+  ).to_dict()
+
+# the heatmap only depends on the elevation and runway length, so changing tabs or the other inputs is a cache read
+@st.cache_data(max_entries=64, show_spinner=False)
+def sensitivity_chart(user_alt, user_runway_length, chart_data_hash):
+  # MinGo over every degree of the density ratio chart against every weight, in one batched evaluation
+  import altair as alt
+  import pandas as pd
+  temps, ac_weights = np.meshgrid(told.dr_temp_x_input_onedegrees, sensitivity_weights)
+  density_ratio, min_go = told.calc_told_batch(temps, user_alt, ac_weights, user_runway_length)
+  # cells off the charts are left blank
+  on_chart = told.min_go_on_chart(density_ratio, ac_weights, user_runway_length)
   source = pd.DataFrame({
-    'RWL': rwl_expanded,
-    'MinGo': min_go_interpolated_upper(rwl_expanded)
+    'Temp(F)': temps[on_chart],
+    'Weight(lbs)': ac_weights[on_chart],
+    'MinGo': np.round(min_go[on_chart],2) + 0.0
   })
 
-  c = alt.Chart(source).mark_line().encode(
-      x='RWL',
-      y='MinGo'
+  # the full grid is up to 6633 cells, past altair's default limit of 5000 rows
+  with alt.data_transformers.enable(max_rows=None):
+    return alt.Chart(source).mark_rect().encode(
+        x=alt.X('Temp(F):O', axis=alt.Axis(values=told.dr_temp_x_input_tendegrees.tolist())),
+        y=alt.Y('Weight(lbs):O', sort='descending', axis=alt.Axis(values=told.weights.tolist())),
+        color='MinGo:Q',
+        tooltip=['Temp(F)', 'Weight(lbs)', 'MinGo']
+    ).to_dict()
+
+# one result cache per server process, shared by every session and filled with the common scenarios by
+# warmup.py before the first one connects
+def get_result_cache(max_entries, ttl):
+  return result_cache.shared_cache(max_entries, ttl)
+
+# one parsed drop directory per path shared by every session, so each changed file is parsed once
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_drop_directory(path):
+  return wx_ingest.DropDirectory(path)
+
+@st.fragment(run_every=wx_scan_seconds)
+def weather_results(user_ac_weight, user_runway_length):
+  # density ratio and MinGo for every station in the drop directory, rescanned on a timer
+  drop = get_drop_directory(wx_directory)
+  drop.scan()
+  rows = drop.results(user_ac_weight, user_runway_length)
+  if not rows:
+    st.info(f'No METAR/TAF reports in {wx_directory}.')
+    return
+  st.caption(f'{len(rows)} stations from {wx_directory}, {user_ac_weight:,} lbs on a {user_runway_length:,} ft runway')
+  import pandas as pd
+  st.dataframe(pd.DataFrame(rows), hide_index=True, width='stretch')
+
+def get_forecast_series(path):
+  # the computed forecast of this session, whose hours are recomputed only when the file or this session's
+  # field, weight or runway change. one shared by every session would recompute the day whenever the next
+  # session asks about another field
+  series = st.session_state.get('forecast_series')
+  if series is None or series.path != path:
+    series = st.session_state['forecast_series'] = wx_forecast.ForecastSeries(path)
+  return series
+
+def forecast_chart(rows):
+  # MinGo by hour (utc) with the off chart hours shaded by why they are off the charts
+  import altair as alt
+  import pandas as pd
+  source = pd.DataFrame({
+    'Time': [row['time'].isoformat() for row in rows],
+    'Temp(F)': [row['temp_f'] for row in rows],
+    'Density Ratio': [row['density_ratio'] for row in rows],
+    'MinGo': [row['min_go'] for row in rows],
+  })
+  line = alt.Chart(source).mark_line(point=True).encode(
+    x=alt.X('Time:T', title='Time (UTC)', scale=alt.Scale(type='utc')),
+    y=alt.Y('MinGo:Q'),
+    tooltip=[alt.Tooltip('Time:T', format='%Y-%m-%d %H:%MZ', formatType='utc'), 'Temp(F)', 'Density Ratio', 'MinGo']
   )
-
-#  st.altair_chart(c, use_container_width = True)
-      
-  return final_min_go
+  windows = wx_forecast.off_chart_windows(rows)
+  if not windows:
+    return line.to_dict()
+  off_chart = pd.DataFrame({
+    'Start': [start.isoformat() for start, end, reason in windows],
+    'End': [end.isoformat() for start, end, reason in windows],
+    'Off Chart': [wx_forecast.off_chart_reasons[reason] for start, end, reason in windows],
+  })
+  shading = alt.Chart(off_chart).mark_rect(opacity=0.25).encode(
+    x='Start:T', x2='End:T',
+    color=alt.Color('Off Chart:N', scale=alt.Scale(scheme='reds'), legend=alt.Legend(orient='bottom', title=None)),
+    tooltip=[alt.Tooltip('Start:T', format='%Y-%m-%d %H:%MZ', formatType='utc'), alt.Tooltip('End:T', format='%Y-%m-%d %H:%MZ', formatType='utc'), 'Off Chart']
+  )
+  return (shading + line).to_dict()
+
+@st.fragment(run_every=forecast_scan_seconds)
+def forecast_results(user_alt, user_ac_weight, user_runway_length):
+  # density ratio and MinGo for every hour of the forecast file, rechecked on a timer
+  series = get_forecast_series(forecast_file)
+  rows, counts = series.update(user_alt, user_ac_weight, user_runway_length)
+  if not rows:
+    st.info(f'No forecast in {forecast_file}.')
+    return
+  st.caption(f'{len(rows)} hours from {forecast_file} at {user_alt:,} ft, {user_ac_weight:,} lbs on a {user_runway_length:,} ft runway, '
+             f"{counts['computed']} recomputed")
+  st.vega_lite_chart(forecast_chart(rows), width='stretch')
+  off_chart_hours = sum(1 for row in rows if row['off_chart'])
+  if off_chart_hours:
+    st.warning(f'MinGo is off the charts for {off_chart_hours} of {len(rows)} hours.')
+
+# one process pool per server process, started on first use and shared by every session
+@st.cache_resource(show_spinner=False)
+def get_monte_carlo_pool(workers):
+  return told_montecarlo.make_pool(workers)
+
+# a seeded run is reproducible, so repeat runs with the same inputs are a cache read
+@st.cache_data(max_entries=64, show_spinner='Sampling...')
+def monte_carlo(user_temp, user_alt, user_ac_weight, user_runway_length, temp_spread, weight_spread, samples, seed, distribution, chart_data_hash):
+  pool = get_monte_carlo_pool(monte_carlo_workers) if monte_carlo_workers > 1 else None
+  return told_montecarlo.run_monte_carlo(user_temp, user_alt, user_ac_weight, user_runway_length, temp_spread, weight_spread,
+    samples, seed, distribution, workers=monte_carlo_workers, pool=pool)
+
+def uncertainty_results(user_temp, user_alt, user_ac_weight, user_runway_length):
+  # MinGo percentiles when the temperature and weight are only known to within a spread
+  col1, col2, col3, col4 = st.columns(4)
+  with col1:
+    temp_spread = st.number_input('Temp +- (F)', min_value=0, step=1, key='temp_spread')
+  with col2:
+    weight_spread = st.number_input('Weight +- (lbs)', min_value=0, step=500, key='weight_spread')
+  with col3:
+    samples = st.number_input('Samples', min_value=1000, max_value=5000000, step=50000, key='samples')
+  with col4:
+    seed = st.number_input('Seed', min_value=0, step=1, key='seed')
+  distribution = st.radio('Distribution', told_montecarlo.distributions, horizontal=True, key='distribution',
+    help='uniform over the spread, or normal with the spread as two standard deviations')
+  if not st.checkbox('Run Monte Carlo', key='run_monte_carlo'):
+    return
+  result = monte_carlo(user_temp, user_alt, user_ac_weight, user_runway_length, temp_spread, weight_spread, samples, seed, distribution, told.chart_data_hash)
+  st.metric('Off Chart Probability', f"{result['off_chart_probability']:.1%}")
+  import pandas as pd
+  st.table(pd.DataFrame({
+    'Percentile': [f'p{percentile}' for percentile in result['percentiles']],
+    'MinGo': [None if value is None else np.round(value,2) + 0.0 for value in result['percentiles'].values()]
+  }))
+  st.caption(f"{samples:,} samples over {monte_carlo_workers} workers, seed {seed}")
+
+def limit_results(user_temp, user_alt, user_ac_weight, user_runway_length):
+  # the reverse question: the heaviest weight or the shortest runway keeping MinGo within a limit
+  solve_for = st.radio('Solve for', ['Max gross weight', 'Min runway length'], horizontal=True, key='solve_for')
+  min_go_limit = st.number_input('MinGo limit', step=5, key='min_go_limit')
+  if solve_for == 'Max gross weight':
+    max_weight = told.max_weight_for_min_go(user_temp, user_alt, user_runway_length, min_go_limit)
+    if max_weight is None:
+      st.warning('No weight on the charts keeps MinGo within the limit.')
+    else:
+      st.metric('Max Gross Weight (lbs)', f'{math.floor(max_weight):,}')
+  else:
+    min_runway_length = told.min_runway_length_for_min_go(user_temp, user_alt, user_ac_weight, min_go_limit)
+    if min_runway_length is None:
+      st.warning('No runway length on the charts keeps MinGo within the limit.')
+    else:
+      st.metric('Min Runway Length (ft)', f'{math.ceil(min_runway_length):,}')
 
  
+# the inputs of the tabs below the charts. only the open tab is drawn, and streamlit drops the state of widgets
+# that are not drawn, so their values are kept in session state under their keys between visits to the tab
+tab_widget_defaults = {
+  'temp_spread': 5, 'weight_spread': 2000, 'samples': 200000, 'seed': 0, 'distribution': told_montecarlo.distributions[0],
+  'run_monte_carlo': False, 'solve_for': 'Max gross weight', 'min_go_limit': 0,
+}
+
+def keep_tab_widget_state():
+  for key, default in tab_widget_defaults.items():
+    st.session_state[key] = st.session_state.get(key, default)
+
 def main():
   
   # set streamlit config parameters
@@ -101,716 +351,133 @@ def main():
   st.title('Growler TOLD')
   st.caption('Disclaimer:   Always reference the PCL charts for official TOLD data.')
   st.write('')
-  input_tab, max_dry_tab = st.tabs(['Inputs', 'MAX/Dry Runway'])
-  
-  # create numpy arrays for the x and y axis values for density ratio chart
-  dr_temp_x_input_tendegrees = np.arange(-60,150, 10)
-  dr_temp_x_input_onedegrees = np.arange(-60,141)
-  dr_dr_y_input = np.arange(0.5,1.31, 0.01, dtype=float)
-  
-  # create lists and convert to numpy array of function values from every 10 degrees for each altitude curve on densiry ratio chart
-  dr_sealevel = [1.3,1.27,1.23,1.2,1.175,1.15,1.125,1.1,1.08,1.06,1.04,1.02,1.0,0.98,0.96,0.94,0.925,0.91,0.89,0.88,0.86]
-  dr_2k = [1.2,1.175,1.15,1.125,1.09,1.07,1.05,1.03,1.01,0.99,0.975,0.95,0.94,0.92,0.9,0.88,0.87,0.85,0.83, 0.82,0.81]
-  dr_4k = [1.12,1.09,1.06,1.04,1.02,0.99,0.975,0.96,0.94,0.925,0.9,0.88,0.87,0.85,0.83,0.82,0.8,0.78,0.775,0.765,0.76]
-  dr_6k = [1.04,1.02,0.99,0.97,0.94,0.925,0.91,0.88,0.87,0.85,0.84,0.825,0.8,0.78,0.775,0.76,0.74,0.73,0.72,0.71,0.7]
-  dr_8k = [0.96,0.94,0.92,0.9,0.875,0.86,0.83,0.82,0.81,0.79,0.78,0.76,0.74,0.73,0.715,0.7,0.69,0.68,0.675,0.67,0.66]
-  dr_sealevel_array = np.array(dr_sealevel)
-  dr_2k_array = np.array(dr_2k)
-  dr_4k_array = np.array(dr_4k)
-  dr_6k_array = np.array(dr_6k)
-  dr_8k_array = np.array(dr_8k)
-  
-  min_go_34 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [0,0,0,0,0,0,0,0,60],
-               '5k': [0,0,0,0,0,0,0,0,0],
-               '6k': [0,0,0,0,0,0,0,0,0],
-               '7k': [0,0,0,0,0,0,0,0,0],
-               '8k': [0,0,0,0,0,0,0,0,0],
-               '9k': [0,0,0,0,0,0,0,0,0],
-               '10k': [0,0,0,0,0,0,0,0,0],
-               '11k': [0,0,0,0,0,0,0,0,0],
-               '12k': [0,0,0,0,0,0,0,0,0]}
-  min_go_38 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [0,0,0,0,0,0,40,70,90],
-               '5k': [0,0,0,0,0,0,0,0,60],
-               '6k': [0,0,0,0,0,0,0,0,0],
-               '7k': [0,0,0,0,0,0,0,0,0],
-               '8k': [0,0,0,0,0,0,0,0,0],
-               '9k': [0,0,0,0,0,0,0,0,0],
-               '10k': [0,0,0,0,0,0,0,0,0],
-               '11k': [0,0,0,0,0,0,0,0,0],
-               '12k': [0,0,0,0,0,0,0,0,0]}
-  min_go_42 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [0,0,0,0,0,75,80,105,115],
-               '5k': [0,0,0,0,0,0,50,75,95],
-               '6k': [0,0,0,0,0,0,0,50,70],
-               '7k': [0,0,0,0,0,0,0,0,50],
-               '8k': [0,0,0,0,0,0,0,0,0],
-               '9k': [0,0,0,0,0,0,0,0,0],
-               '10k': [0,0,0,0,0,0,0,0,0],
-               '11k': [0,0,0,0,0,0,0,0,0],
-               '12k': [0,0,0,0,0,0,0,0,0]}
-  min_go_46 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [0,0,0,0,50,100,110,125,135],
-               '5k': [0,0,0,0,0,50,90,105,120],
-               '6k': [0,0,0,0,0,0,50,90,105],
-               '7k': [0,0,0,0,0,0,0,50,90],
-               '8k': [0,0,0,0,0,0,0,0,50],
-               '9k': [0,0,0,0,0,0,0,0,0],
-               '10k': [0,0,0,0,0,0,0,0,0],
-               '11k': [0,0,0,0,0,0,0,0,0],
-               '12k': [0,0,0,0,0,0,0,0,0]}
-  min_go_50 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [0,0,0,30,90,120,130,135,-1],
-               '5k': [0,0,0,0,30,90,115,125,135],
-               '6k': [0,0,0,0,0,20,90,115,125],
-               '7k': [0,0,0,0,0,0,60,90,115],
-               '8k': [0,0,0,0,0,0,0,70,90],
-               '9k': [0,0,0,0,0,0,0,0,80],
-               '10k': [0,0,0,0,0,0,0,0,70],
-               '11k': [0,0,0,0,0,0,0,0,0],
-               '12k': [0,0,0,0,0,0,0,0,0]}
-  min_go_54 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [0,0,60,100,110,140,145,-1,-1],
-               '5k': [0,0,0,30,85,110,130,140,-1],
-               '6k': [0,0,0,0,40,80,110,130,140],
-               '7k': [0,0,0,0,0,35,100,110,130],
-               '8k': [0,0,0,0,0,0,60,105,110],
-               '9k': [0,0,0,0,0,0,0,80,110],
-               '10k': [0,0,0,0,0,0,0,50,100],
-               '11k': [0,0,0,0,0,0,0,0,60],
-               '12k': [0,0,0,0,0,0,0,0,55]}
-  min_go_58 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [0,80,100,120,130,150,-1,-1,-1],
-               '5k': [0,0,30,90,110,130,145,150,-1],
-               '6k': [0,0,0,35,90,110,130,145,150],
-               '7k': [0,0,0,0,35,90,120,130,145],
-               '8k': [0,0,0,0,0,80,100,125,130],
-               '9k': [0,0,0,0,0,0,80,110,125],
-               '10k': [0,0,0,0,0,0,50,100,120],
-               '11k': [0,0,0,0,0,0,0,90,100],
-               '12k': [0,0,0,0,0,0,0,80,95]}
-  min_go_62 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [0,110,120,135,145,-1,-1,-1,-1],
-               '5k': [0,0,90,115,130,145,155,-1,-1],
-               '6k': [0,0,0,80,115,130,145,155,-1],
-               '7k': [0,0,0,0,90,115,135,145,155],
-               '8k': [0,0,0,0,50,110,120,140,145],
-               '9k': [0,0,0,0,0,80,110,125,140],
-               '10k': [0,0,0,0,0,50,95,120,135],
-               '11k': [0,0,0,0,0,0,80,110,120],
-               '12k': [0,0,0,0,0,0,50,110,120]}
-  min_go_66 = {'DR': [1.1,1.05,1.0,0.95,0.9,0.85,0.8,0.75,0.7],
-               '4k': [80,125,135,145,155,-1,-1,-1,-1],
-               '5k': [30,80,115,130,145,155,-1,-1,-1],
-               '6k': [0,0,80,110,130,145,155,-1,-1],
-               '7k': [0,0,0,80,115,130,145,155,-1],
-               '8k': [0,0,0,50,100,125,135,150,155],
-               '9k': [0,0,0,0,80,110,125,140,150],
-               '10k': [0,0,0,0,50,95,115,135,150],
-               '11k': [0,0,0,0,0,80,110,125,135],
-               '12k': [0,0,0,0,0,30,100,125,135]}
-
-  
-  min_go_34_df = pd.DataFrame(min_go_34)
-  min_go_38_df = pd.DataFrame(min_go_38)
-  min_go_42_df = pd.DataFrame(min_go_42)
-  min_go_46_df = pd.DataFrame(min_go_46)
-  min_go_50_df = pd.DataFrame(min_go_50)
-  min_go_54_df = pd.DataFrame(min_go_54)
-  min_go_58_df = pd.DataFrame(min_go_58)
-  min_go_62_df = pd.DataFrame(min_go_62)
-  min_go_66_df = pd.DataFrame(min_go_66)
-  
-  runway_lengths = [4000, 5000, 6000, 7000, 8000, 9000, 10000, 11000, 12000]
-  runway_lengths_array = np.array(runway_lengths)
-  rwl_expanded = np.arange(4000, 12000, 100)
+  # a tab for every registered chart whose tables are in the chart data. switching tabs reruns the script and
+  # only the open tab is computed
+  chart_tabs = chart_registry.tab_charts()
+  labels = ['Inputs'] + [chart.tab for chart in chart_tabs] + ['Sensitivity', 'Uncertainty', 'Limits', 'Weather', 'Forecast']
+  tabs = dict(zip(labels, st.tabs(labels, key='tab', on_change='rerun')))
   
-  with input_tab:
+  # per-stage timers, on for every rerun with TOLD_DIAGNOSTICS=1 or for this page with ?diagnostics=1
+  show_diagnostics = st.query_params.get('diagnostics', '') not in ('', '0')
+  timer = diagnostics.StageTimer(diagnostics.log_enabled or show_diagnostics)
+  try:
+    told_results(timer, tabs, chart_tabs)
+  finally:
+    timer.log()
+  if show_diagnostics:
+    with st.expander('Diagnostics', expanded=True):
+      st.caption(f'Rerun {timer.total_ms():.2f} ms')
+      st.table(timer.stages)
+      st.caption('Shared result cache')
+      st.json(get_result_cache(result_cache_size, result_cache_ttl).stats())
+
+def told_results(timer, tabs, chart_tabs):
+  keep_tab_widget_state()
+  with tabs['Inputs']:
       with st.container():
-        user_temp, user_alt, user_ac_weight, user_runway_length = get_user_inputs()
+        with timer.stage('inputs'):
+          user_temp, user_alt, user_ac_weight, user_runway_length = get_user_inputs()
+          show_charts = st.checkbox('Show charts', value=False)
+  inputs = {'temp': user_temp, 'alt': user_alt, 'weight': user_ac_weight, 'runway_length': user_runway_length}
+  timer.fields['inputs'] = inputs
+  timer.fields['tab'] = next((label for label, tab in tabs.items() if tab.open), None)
+  for chart in chart_tabs:
+    if tabs[chart.tab].open:
+      with tabs[chart.tab]:
+          chart_tab_renderers.get(chart.name, chart_results)(timer, chart, inputs, show_charts)
+  if tabs['Sensitivity'].open:
+    with tabs['Sensitivity']:
+        with timer.stage('sensitivity'):
+          st.caption(f'MinGo by temperature and weight at {user_alt:,} ft and a {user_runway_length:,} ft runway')
+          st.vega_lite_chart(sensitivity_chart(user_alt, user_runway_length, told.chart_data_hash), width='stretch')
+  if tabs['Uncertainty'].open:
+    with tabs['Uncertainty']:
+        with timer.stage('uncertainty'):
+          uncertainty_results(user_temp, user_alt, user_ac_weight, user_runway_length)
+  if tabs['Limits'].open:
+    with tabs['Limits']:
+        with timer.stage('limits'):
+          limit_results(user_temp, user_alt, user_ac_weight, user_runway_length)
+  if tabs['Weather'].open:
+    with tabs['Weather']:
+        with timer.stage('weather'):
+          weather_results(user_ac_weight, user_runway_length)
+  if tabs['Forecast'].open:
+    with tabs['Forecast']:
+        with timer.stage('forecast'):
+          forecast_results(user_alt, user_ac_weight, user_runway_length)
+
+def max_dry_results(timer, chart, inputs, show_charts):
+  # the MAX/Dry chart keeps its own pipeline, which shows the density ratio on the way and skips the stages
+  # whose inputs did not change. inputs any session has already asked about come from the shared result cache,
+  # otherwise only the stages downstream of a changed input are recomputed, the rest come from this session's
+  # last run
+  cache = get_result_cache(result_cache_size, result_cache_ttl)
+  key = result_cache.told_key(told.chart_data_hash, inputs)
+  results = cache.get(key)
+  timer.fields['result_cache'] = 'miss' if results is None else 'hit'
+  if results is None:
+    results, timer.fields['recomputed'] = told_pipeline.run(inputs, st.session_state.setdefault('told_pipeline_memo', {}), timer)
+    cache.put(key, results)
+  altitude_band = results['altitude_blend']
+  if altitude_band is None:
+    st.warning('Off chart: the field elevation is outside the density ratio chart.')
+    return
+  st.metric('Density Ratio', results['density_ratio'], delta=None, delta_color="normal")
+  if show_charts:
+    with timer.stage('density_ratio_chart'):
+      st.vega_lite_chart(density_ratio_chart(*altitude_band, chart_point_budget, told.chart_data_hash), width='stretch')
   
-  # if the field elevation altitude is 0
-  if user_alt == 0:
-    interp_y = dr_sealevel_array
-    with max_dry_tab:
-        density_ratio_calculated = calc_density_ratio(interp_y, dr_temp_x_input_tendegrees, dr_temp_x_input_onedegrees, user_temp)
-    
-  # if the field elevation altitude is between 0 and 2000 ft
-  if 0 < user_alt <=2000:
-    # create a ratio for biasing weights on combining curves
-    ratio = (user_alt)/2000
-    interp_y = ((1-ratio)*dr_sealevel_array + (ratio)*dr_2k_array)
-    with max_dry_tab:
-        density_ratio_calculated = calc_density_ratio(interp_y, dr_temp_x_input_tendegrees, dr_temp_x_input_onedegrees, user_temp)
-    
-  # if the field elevation altitude is between 2000 and 4000 ft
-  if 2000 < user_alt <=4000:
-    # create a ratio for biasing weights on combining curves
-    ratio = (user_alt-2000)/2000
-    interp_y = ((1-ratio)*dr_2k_array + (ratio)*dr_4k_array)
-    with max_dry_tab:
-        density_ratio_calculated = calc_density_ratio(interp_y, dr_temp_x_input_tendegrees, dr_temp_x_input_onedegrees, user_temp)
-    
-  # if the field elevation altitude is between 4000 and 6000 ft
-  if 4000 < user_alt <=6000:
-    # create a ratio for biasing weights on combining curves
-    ratio = (user_alt-4000)/2000
-    interp_y = ((1-ratio)*dr_4k_array + (ratio)*dr_6k_array)
-    with max_dry_tab:
-        density_ratio_calculated = calc_density_ratio(interp_y, dr_temp_x_input_tendegrees, dr_temp_x_input_onedegrees, user_temp)
-    
-  # if the field elevation altitude is between 6000 and 8000 ft
-  if 6000 < user_alt <=8000:
-    # create a ratio for biasing weights on combining curves
-    ratio = (user_alt-6000)/2000
-    interp_y = ((1-ratio)*dr_6k_array + (ratio)*dr_8k_array)
-    with max_dry_tab:
-        density_ratio_calculated = calc_density_ratio(interp_y, dr_temp_x_input_tendegrees, dr_temp_x_input_onedegrees, user_temp)
-  
-  if 34000 < user_ac_weight <= 38000:
-    # create a ratio for biasing weights on combining curves
-    ratio_weight = (user_ac_weight-34000)/4000
-    
-    if 0.70 <= density_ratio_calculated <= 0.75:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[8,1:] + (ratio_weight)*min_go_38_df.iloc[8,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[7,1:] + (ratio_weight)*min_go_38_df.iloc[7,1:])
-
-      ratio_2 = (density_ratio_calculated-0.7)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-      
-    if 0.75 < density_ratio_calculated <= 0.8:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[7,1:] + (ratio_weight)*min_go_38_df.iloc[7,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[6,1:] + (ratio_weight)*min_go_38_df.iloc[6,1:])
-
-      ratio_2 = (density_ratio_calculated-0.75)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-      
-    if 0.8 < density_ratio_calculated <= 0.85:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[6,1:] + (ratio_weight)*min_go_38_df.iloc[6,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[5,1:] + (ratio_weight)*min_go_38_df.iloc[5,1:])
-
-      ratio_2 = (density_ratio_calculated-0.8)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-      
-    if 0.85 < density_ratio_calculated <= 0.9:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[5,1:] + (ratio_weight)*min_go_38_df.iloc[5,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[4,1:] + (ratio_weight)*min_go_38_df.iloc[4,1:])
-
-      ratio_2 = (density_ratio_calculated-0.85)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
+  if results['curve_selection'] is None:
+    st.warning('Off chart: the aircraft weight or density ratio is outside the MinGo charts.')
+    return
+  weight_band, ratio_weight, density_ratio_band = results['curve_selection'][:3]
+  if results['runway_interpolation'] is None:
+    st.metric('MinGo', 'Off chart', delta=None, delta_color="normal")
+    st.warning('Off chart: the runway is too short for this weight and density ratio.')
+  else:
+    # + 0.0 shows a MinGo rounding to -0.0 as 0.0
+    st.metric('MinGo', np.round(results['runway_interpolation'],2) + 0.0, delta=None, delta_color="normal")
+  if show_charts:
+    with timer.stage('min_go_chart'):
+      st.vega_lite_chart(min_go_chart(weight_band, ratio_weight, density_ratio_band, chart_point_budget, told.chart_data_hash), width='stretch')
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def registry_chart(name, outer_inputs, point_budget, chart_data_hash):
+  # a registered chart over its last axis, with the other inputs held at the user's values
+  import altair as alt
+  import pandas as pd
+  chart = chart_registry.charts[name]
+  last_axis = told.charts[chart.axes[-1].table]
+  x = np.linspace(last_axis[0], last_axis[-1], max(point_budget, 2))
+  source = pd.DataFrame({
+    chart.axes[-1].input: x,
+    chart.label: chart_registry.evaluate(chart, *outer_inputs, x)
+  })
 
-    if 0.9 < density_ratio_calculated <= 0.95:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[4,1:] + (ratio_weight)*min_go_38_df.iloc[4,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[3,1:] + (ratio_weight)*min_go_38_df.iloc[3,1:])
-      
-      ratio_2 = (density_ratio_calculated-0.9)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.95 < density_ratio_calculated <= 1.0:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[3,1:] + (ratio_weight)*min_go_38_df.iloc[3,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[2,1:] + (ratio_weight)*min_go_38_df.iloc[2,1:])
-
-      ratio_2 = (density_ratio_calculated-0.95)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.0 < density_ratio_calculated <= 1.05:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[2,1:] + (ratio_weight)*min_go_38_df.iloc[2,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[1,1:] + (ratio_weight)*min_go_38_df.iloc[1,1:])
-
-      ratio_2 = (density_ratio_calculated-1.0)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.05 < density_ratio_calculated <= 1.1:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[1,1:] + (ratio_weight)*min_go_38_df.iloc[1,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_34_df.iloc[0,1:] + (ratio_weight)*min_go_38_df.iloc[0,1:])
-
-      ratio_2 = (density_ratio_calculated-1.05)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-  if 38000 < user_ac_weight <= 42000:
-    # create a ratio for biasing weights on combining curves
-    ratio_weight = (user_ac_weight-38000)/4000
-    
-    if 0.70 <= density_ratio_calculated <= 0.75:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[8,1:] + (ratio_weight)*min_go_42_df.iloc[8,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[7,1:] + (ratio_weight)*min_go_42_df.iloc[7,1:])
-
-      ratio_2 = (density_ratio_calculated-0.7)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.75 < density_ratio_calculated <= 0.8:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[7,1:] + (ratio_weight)*min_go_42_df.iloc[7,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[6,1:] + (ratio_weight)*min_go_42_df.iloc[6,1:])
-
-      ratio_2 = (density_ratio_calculated-0.75)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.8 < density_ratio_calculated <= 0.85:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[6,1:] + (ratio_weight)*min_go_42_df.iloc[6,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[5,1:] + (ratio_weight)*min_go_42_df.iloc[5,1:])
-
-      ratio_2 = (density_ratio_calculated-0.8)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.85 < density_ratio_calculated <= 0.9:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[5,1:] + (ratio_weight)*min_go_42_df.iloc[5,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[4,1:] + (ratio_weight)*min_go_42_df.iloc[4,1:])
-
-      ratio_2 = (density_ratio_calculated-0.85)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.9 < density_ratio_calculated <= 0.95:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[4,1:] + (ratio_weight)*min_go_42_df.iloc[4,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[3,1:] + (ratio_weight)*min_go_42_df.iloc[3,1:])
-
-      ratio_2 = (density_ratio_calculated-0.9)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.95 < density_ratio_calculated <= 1.0:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[3,1:] + (ratio_weight)*min_go_42_df.iloc[3,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[2,1:] + (ratio_weight)*min_go_42_df.iloc[2,1:])
-
-      ratio_2 = (density_ratio_calculated-0.95)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.0 < density_ratio_calculated <= 1.05:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[2,1:] + (ratio_weight)*min_go_42_df.iloc[2,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[1,1:] + (ratio_weight)*min_go_42_df.iloc[1,1:])
-
-      ratio_2 = (density_ratio_calculated-1.0)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.05 < density_ratio_calculated <= 1.1:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[1,1:] + (ratio_weight)*min_go_42_df.iloc[1,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_38_df.iloc[0,1:] + (ratio_weight)*min_go_42_df.iloc[0,1:])
-
-      ratio_2 = (density_ratio_calculated-1.05)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-  if 42000 < user_ac_weight <= 46000:
-    # create a ratio for biasing weights on combining curves
-    ratio_weight = (user_ac_weight-42000)/4000
-    
-    if 0.70 <= density_ratio_calculated <= 0.75:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[8,1:] + (ratio_weight)*min_go_46_df.iloc[8,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[7,1:] + (ratio_weight)*min_go_46_df.iloc[7,1:])
-
-      ratio_2 = (density_ratio_calculated-0.7)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.75 < density_ratio_calculated <= 0.8:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[7,1:] + (ratio_weight)*min_go_46_df.iloc[7,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[6,1:] + (ratio_weight)*min_go_46_df.iloc[6,1:])
-
-      ratio_2 = (density_ratio_calculated-0.75)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.8 < density_ratio_calculated <= 0.85:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[6,1:] + (ratio_weight)*min_go_46_df.iloc[6,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[5,1:] + (ratio_weight)*min_go_46_df.iloc[5,1:])
-
-      ratio_2 = (density_ratio_calculated-0.8)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.85 < density_ratio_calculated <= 0.9:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[5,1:] + (ratio_weight)*min_go_46_df.iloc[5,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[4,1:] + (ratio_weight)*min_go_46_df.iloc[4,1:])
-
-      ratio_2 = (density_ratio_calculated-0.85)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.9 < density_ratio_calculated <= 0.95:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[4,1:] + (ratio_weight)*min_go_46_df.iloc[4,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[3,1:] + (ratio_weight)*min_go_46_df.iloc[3,1:])
-
-      ratio_2 = (density_ratio_calculated-0.9)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.95 < density_ratio_calculated <= 1.0:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[3,1:] + (ratio_weight)*min_go_46_df.iloc[3,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[2,1:] + (ratio_weight)*min_go_46_df.iloc[2,1:])
-
-      ratio_2 = (density_ratio_calculated-0.95)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.0 < density_ratio_calculated <= 1.05:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[2,1:] + (ratio_weight)*min_go_46_df.iloc[2,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[1,1:] + (ratio_weight)*min_go_46_df.iloc[1,1:])
-
-      ratio_2 = (density_ratio_calculated-1.0)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.05 < density_ratio_calculated <= 1.1:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[1,1:] + (ratio_weight)*min_go_46_df.iloc[1,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_42_df.iloc[0,1:] + (ratio_weight)*min_go_46_df.iloc[0,1:])
-
-      ratio_2 = (density_ratio_calculated-1.05)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)  
-
-  if 46000 < user_ac_weight <= 50000:
-    # create a ratio for biasing weights on combining curves
-    ratio_weight = (user_ac_weight-46000)/4000
-    
-    if 0.70 <= density_ratio_calculated <= 0.75:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[8,1:] + (ratio_weight)*min_go_50_df.iloc[8,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[7,1:] + (ratio_weight)*min_go_50_df.iloc[7,1:])
-
-      ratio_2 = (density_ratio_calculated-0.7)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.75 < density_ratio_calculated <= 0.8:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[7,1:] + (ratio_weight)*min_go_50_df.iloc[7,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[6,1:] + (ratio_weight)*min_go_50_df.iloc[6,1:])
-
-      ratio_2 = (density_ratio_calculated-0.75)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.8 < density_ratio_calculated <= 0.85:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[6,1:] + (ratio_weight)*min_go_50_df.iloc[6,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[5,1:] + (ratio_weight)*min_go_50_df.iloc[5,1:])
-
-      ratio_2 = (density_ratio_calculated-0.8)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.85 < density_ratio_calculated <= 0.9:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[5,1:] + (ratio_weight)*min_go_50_df.iloc[5,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[4,1:] + (ratio_weight)*min_go_50_df.iloc[4,1:])
-
-      ratio_2 = (density_ratio_calculated-0.85)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.9 < density_ratio_calculated <= 0.95:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[4,1:] + (ratio_weight)*min_go_50_df.iloc[4,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[3,1:] + (ratio_weight)*min_go_50_df.iloc[3,1:])
-
-      ratio_2 = (density_ratio_calculated-0.9)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.95 < density_ratio_calculated <= 1.0:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[3,1:] + (ratio_weight)*min_go_50_df.iloc[3,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[2,1:] + (ratio_weight)*min_go_50_df.iloc[2,1:])
-
-      ratio_2 = (density_ratio_calculated-0.95)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.0 < density_ratio_calculated <= 1.05:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[2,1:] + (ratio_weight)*min_go_50_df.iloc[2,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[1,1:] + (ratio_weight)*min_go_50_df.iloc[1,1:])
-
-      ratio_2 = (density_ratio_calculated-1.0)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.05 < density_ratio_calculated <= 1.1:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[1,1:] + (ratio_weight)*min_go_50_df.iloc[1,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_46_df.iloc[0,1:] + (ratio_weight)*min_go_50_df.iloc[0,1:])
-
-      ratio_2 = (density_ratio_calculated-1.05)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-      
-  if 50000 < user_ac_weight <= 54000:
-    # create a ratio for biasing weights on combining curves
-    ratio_weight = (user_ac_weight-50000)/4000
-    
-    if 0.70 <= density_ratio_calculated <= 0.75:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[8,1:] + (ratio_weight)*min_go_54_df.iloc[8,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[7,1:] + (ratio_weight)*min_go_54_df.iloc[7,1:])
-
-      ratio_2 = (density_ratio_calculated-0.7)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.75 < density_ratio_calculated <= 0.8:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[7,1:] + (ratio_weight)*min_go_54_df.iloc[7,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[6,1:] + (ratio_weight)*min_go_54_df.iloc[6,1:])
-
-      ratio_2 = (density_ratio_calculated-0.75)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.8 < density_ratio_calculated <= 0.85:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[6,1:] + (ratio_weight)*min_go_54_df.iloc[6,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[5,1:] + (ratio_weight)*min_go_54_df.iloc[5,1:])
-
-      ratio_2 = (density_ratio_calculated-0.8)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.85 < density_ratio_calculated <= 0.9:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[5,1:] + (ratio_weight)*min_go_54_df.iloc[5,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[4,1:] + (ratio_weight)*min_go_54_df.iloc[4,1:])
-
-      ratio_2 = (density_ratio_calculated-0.85)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.9 < density_ratio_calculated <= 0.95:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[4,1:] + (ratio_weight)*min_go_54_df.iloc[4,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[3,1:] + (ratio_weight)*min_go_54_df.iloc[3,1:])
-
-      ratio_2 = (density_ratio_calculated-0.9)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.95 < density_ratio_calculated <= 1.0:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[3,1:] + (ratio_weight)*min_go_54_df.iloc[3,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[2,1:] + (ratio_weight)*min_go_54_df.iloc[2,1:])
-
-      ratio_2 = (density_ratio_calculated-0.95)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.0 < density_ratio_calculated <= 1.05:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[2,1:] + (ratio_weight)*min_go_54_df.iloc[2,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[1,1:] + (ratio_weight)*min_go_54_df.iloc[1,1:])
-
-      ratio_2 = (density_ratio_calculated-1.0)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.05 < density_ratio_calculated <= 1.1:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[1,1:] + (ratio_weight)*min_go_54_df.iloc[1,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_50_df.iloc[0,1:] + (ratio_weight)*min_go_54_df.iloc[0,1:])
-      
-      ratio_2 = (density_ratio_calculated-1.05)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-  if 54000 < user_ac_weight <= 58000:
-    # create a ratio for biasing weights on combining curves
-    ratio_weight = (user_ac_weight-54000)/4000
-    
-    if 0.70 <= density_ratio_calculated <= 0.75:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[8,1:] + (ratio_weight)*min_go_58_df.iloc[8,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[7,1:] + (ratio_weight)*min_go_58_df.iloc[7,1:])
-
-      ratio_2 = (density_ratio_calculated-0.7)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.75 < density_ratio_calculated <= 0.8:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[7,1:] + (ratio_weight)*min_go_58_df.iloc[7,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[6,1:] + (ratio_weight)*min_go_58_df.iloc[6,1:])
-
-      ratio_2 = (density_ratio_calculated-0.75)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.8 < density_ratio_calculated <= 0.85:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[6,1:] + (ratio_weight)*min_go_58_df.iloc[6,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[5,1:] + (ratio_weight)*min_go_58_df.iloc[5,1:])
-
-      ratio_2 = (density_ratio_calculated-0.8)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.85 < density_ratio_calculated <= 0.9:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[5,1:] + (ratio_weight)*min_go_58_df.iloc[5,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[4,1:] + (ratio_weight)*min_go_58_df.iloc[4,1:])
-
-      ratio_2 = (density_ratio_calculated-0.85)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.9 < density_ratio_calculated <= 0.95:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[4,1:] + (ratio_weight)*min_go_58_df.iloc[4,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[3,1:] + (ratio_weight)*min_go_58_df.iloc[3,1:])
-
-      ratio_2 = (density_ratio_calculated-0.9)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.95 < density_ratio_calculated <= 1.0:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[3,1:] + (ratio_weight)*min_go_58_df.iloc[3,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[2,1:] + (ratio_weight)*min_go_58_df.iloc[2,1:])
-
-      ratio_2 = (density_ratio_calculated-0.95)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.0 < density_ratio_calculated <= 1.05:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[2,1:] + (ratio_weight)*min_go_58_df.iloc[2,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[1,1:] + (ratio_weight)*min_go_58_df.iloc[1,1:])
-
-      ratio_2 = (density_ratio_calculated-1.0)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.05 < density_ratio_calculated <= 1.1:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[1,1:] + (ratio_weight)*min_go_58_df.iloc[1,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_54_df.iloc[0,1:] + (ratio_weight)*min_go_58_df.iloc[0,1:])
-
-      ratio_2 = (density_ratio_calculated-1.05)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-  if 58000 < user_ac_weight <= 62000:
-    # create a ratio for biasing weights on combining curves
-    ratio_weight = (user_ac_weight-58000)/4000
-    
-    if 0.70 <= density_ratio_calculated <= 0.75:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[8,1:] + (ratio_weight)*min_go_62_df.iloc[8,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[7,1:] + (ratio_weight)*min_go_62_df.iloc[7,1:])
-
-      ratio_2 = (density_ratio_calculated-0.7)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.75 < density_ratio_calculated <= 0.8:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[7,1:] + (ratio_weight)*min_go_62_df.iloc[7,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[6,1:] + (ratio_weight)*min_go_62_df.iloc[6,1:])
-
-      ratio_2 = (density_ratio_calculated-0.75)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.8 < density_ratio_calculated <= 0.85:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[6,1:] + (ratio_weight)*min_go_62_df.iloc[6,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[5,1:] + (ratio_weight)*min_go_62_df.iloc[5,1:])
-
-      ratio_2 = (density_ratio_calculated-0.8)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.85 < density_ratio_calculated <= 0.9:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[5,1:] + (ratio_weight)*min_go_62_df.iloc[5,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[4,1:] + (ratio_weight)*min_go_62_df.iloc[4,1:])
-
-      ratio_2 = (density_ratio_calculated-0.85)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.9 < density_ratio_calculated <= 0.95:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[4,1:] + (ratio_weight)*min_go_62_df.iloc[4,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[3,1:] + (ratio_weight)*min_go_62_df.iloc[3,1:])
-
-      ratio_2 = (density_ratio_calculated-0.9)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.95 < density_ratio_calculated <= 1.0:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[3,1:] + (ratio_weight)*min_go_62_df.iloc[3,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[2,1:] + (ratio_weight)*min_go_62_df.iloc[2,1:])
-
-      ratio_2 = (density_ratio_calculated-0.95)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.0 < density_ratio_calculated <= 1.05:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[2,1:] + (ratio_weight)*min_go_62_df.iloc[2,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[1,1:] + (ratio_weight)*min_go_62_df.iloc[1,1:])
-
-      ratio_2 = (density_ratio_calculated-1.0)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.05 < density_ratio_calculated <= 1.1:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[1,1:] + (ratio_weight)*min_go_62_df.iloc[1,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_58_df.iloc[0,1:] + (ratio_weight)*min_go_62_df.iloc[0,1:])
-
-      ratio_2 = (density_ratio_calculated-1.05)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-      
-  if 62000 < user_ac_weight <= 66000:
-    # create a ratio for biasing weights on combining curves
-    ratio_weight = (user_ac_weight-62000)/4000
-    
-    if 0.70 <= density_ratio_calculated <= 0.75:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[8,1:] + (ratio_weight)*min_go_66_df.iloc[8,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[7,1:] + (ratio_weight)*min_go_66_df.iloc[7,1:])
-
-      ratio_2 = (density_ratio_calculated-0.7)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.75 < density_ratio_calculated <= 0.8:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[7,1:] + (ratio_weight)*min_go_66_df.iloc[7,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[6,1:] + (ratio_weight)*min_go_66_df.iloc[6,1:])
-
-      ratio_2 = (density_ratio_calculated-0.75)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.8 < density_ratio_calculated <= 0.85:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[6,1:] + (ratio_weight)*min_go_66_df.iloc[6,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[5,1:] + (ratio_weight)*min_go_66_df.iloc[5,1:])
-
-      ratio_2 = (density_ratio_calculated-0.8)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.85 < density_ratio_calculated <= 0.9:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[5,1:] + (ratio_weight)*min_go_66_df.iloc[5,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[4,1:] + (ratio_weight)*min_go_66_df.iloc[4,1:])
-
-      ratio_2 = (density_ratio_calculated-0.85)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.9 < density_ratio_calculated <= 0.95:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[4,1:] + (ratio_weight)*min_go_66_df.iloc[4,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[3,1:] + (ratio_weight)*min_go_66_df.iloc[3,1:])
-
-      ratio_2 = (density_ratio_calculated-0.9)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 0.95 < density_ratio_calculated <= 1.0:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[3,1:] + (ratio_weight)*min_go_66_df.iloc[3,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[2,1:] + (ratio_weight)*min_go_66_df.iloc[2,1:])
-
-      ratio_2 = (density_ratio_calculated-0.95)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.0 < density_ratio_calculated <= 1.05:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[2,1:] + (ratio_weight)*min_go_66_df.iloc[2,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[1,1:] + (ratio_weight)*min_go_66_df.iloc[1,1:])
-
-      ratio_2 = (density_ratio_calculated-1.0)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
-
-    if 1.05 < density_ratio_calculated <= 1.1:
-      interp_ys_lower_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[1,1:] + (ratio_weight)*min_go_66_df.iloc[1,1:])
-      interp_ys_upper_weightcurve = ((1-ratio_weight)*min_go_62_df.iloc[0,1:] + (ratio_weight)*min_go_66_df.iloc[0,1:])
-
-      ratio_2 = (density_ratio_calculated-1.05)/0.05
-      with max_dry_tab:
-          final_min_go = calc_min_go(ratio_2, runway_lengths_array, interp_ys_lower_weightcurve, interp_ys_upper_weightcurve, rwl_expanded, user_runway_length)
+  return alt.Chart(source).mark_line().encode(
+      x=chart.axes[-1].input,
+      y=chart.label
+  ).to_dict()
+
+def chart_results(timer, chart, inputs, show_charts):
+  # any registered chart: its value at the inputs, computing the charts it reads first, and its curve
+  with timer.stage(chart.name):
+    values = chart_registry.calc_chart(chart, inputs)
+  value = float(values[chart.name])
+  label = f'{chart.label} ({chart.unit})' if chart.unit else chart.label
+  if np.isnan(value):
+    st.metric(label, 'Off chart', delta=None, delta_color="normal")
+    st.warning(f'Off chart: the inputs are outside the {chart.label} chart.')
+    return
+  st.metric(label, np.round(value,2) + 0.0, delta=None, delta_color="normal")
+  if show_charts:
+    with timer.stage(f'{chart.name}_chart'):
+      outer_inputs = tuple(float(values[name]) for name in chart.inputs[:-1])
+      st.vega_lite_chart(registry_chart(chart.name, outer_inputs, chart_point_budget, told.chart_data_hash), width='stretch')
+
+# charts drawn by their own function rather than chart_results
+chart_tab_renderers = {chart_registry.min_go_max_dry.name: max_dry_results}
 
       
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+# the precomputed spline coefficients in the chart data against interp1d(kind='quadratic', fill_value='extrapolate'),
+# which the baseline app fitted on every rerun, for every chart curve over its domain and past both ends. MinGo
+# rows are fitted from their first real (not -1) cell on
+import numpy as np
+import pytest
+from scipy import interpolate
+
+import spline
+import told
+
+def reference(x, y, queries):
+  return interpolate.interp1d(x, y, kind='quadratic', fill_value='extrapolate')(queries)
+
+@pytest.mark.parametrize('altitude', range(len(told.altitudes)))
+def test_density_ratio_curves(altitude):
+  temps = np.arange(told.dr_temp_x_input_tendegrees[0] - 10, told.dr_temp_x_input_tendegrees[-1] + 10.05, 0.1)
+  kernel = spline.QuadraticSpline(told.dr_breaks, told.dr_coefficients[altitude])
+  expected = reference(told.dr_temp_x_input_tendegrees, told.dr_curves[altitude], temps)
+  np.testing.assert_allclose(kernel(temps), expected, rtol=0, atol=spline.tolerance)
+
+@pytest.mark.parametrize('weight', range(len(told.weights)))
+def test_min_go_charts(weight):
+  runway_lengths = np.arange(told.runway_lengths_array[0] - 1000, told.runway_lengths_array[-1] + 1001, 10)
+  for density_ratio in range(len(told.density_ratios)):
+    kernel = spline.QuadraticSpline(told.min_go_breaks, told.min_go_coefficients[weight, density_ratio])
+    first = told.runway_boundary[weight, density_ratio]
+    expected = reference(told.runway_lengths_array[first:], told.min_go_tensor[weight, density_ratio, first:], runway_lengths)
+    np.testing.assert_allclose(kernel(runway_lengths), expected, rtol=0, atol=spline.tolerance)
+
+def test_blended_curves():
+  # blends of the coefficients are the blends of the row splines
+  runway_lengths = np.arange(told.runway_lengths_array[0], told.runway_lengths_array[-1] + 1, 10)
+  def row(w, d):
+    first = told.runway_boundary[w, d]
+    return reference(told.runway_lengths_array[first:], told.min_go_tensor[w, d, first:], runway_lengths)
+  for user_ac_weight in np.arange(told.weights[0] + 500, told.weights[-1] + 1, 1000):
+    for density_ratio_band in range(1, len(told.density_ratios)):
+      weight_band, ratio_weight = told.min_go_bands(user_ac_weight, told.density_ratios[density_ratio_band])[:2]
+      kernels = told.min_go_splines(weight_band, ratio_weight, density_ratio_band)
+      for kernel, d in zip(kernels, (density_ratio_band - 1, density_ratio_band)):
+        expected = (1-ratio_weight)*row(weight_band - 1, d) + ratio_weight*row(weight_band, d)
+        np.testing.assert_allclose(kernel(runway_lengths), expected, rtol=0, atol=spline.tolerance)
@@ -0,0 +1,86 @@
+# regression tests for the TOLD engine against a reference engine: every chart row read with
+# interp1d(kind='quadratic') along the runway length from its first real (not -1) cell on, and the rows blended
+# around the weight and density ratio
+import numpy as np
+import pytest
+from scipy import interpolate
+
+import told
+
+def reference_row(w, d, user_runway_length):
+  first = told.runway_boundary[w, d]
+  return interpolate.interp1d(told.runway_lengths_array[first:], told.min_go_tensor[w, d, first:], kind='quadratic',
+                              fill_value='extrapolate')(user_runway_length)
+
+def reference_min_go(density_ratio_calculated, user_ac_weight, user_runway_length):
+  # MinGo from the rows fitted through their real cells only, nan off the weight or density ratio charts
+  min_go_bands = told.min_go_bands(user_ac_weight, density_ratio_calculated)
+  if min_go_bands is None:
+    return np.nan
+  w, ratio_weight, d, ratio_2 = min_go_bands
+  lower, upper = ((1-ratio_weight)*reference_row(w-1, row, user_runway_length) + ratio_weight*reference_row(w, row, user_runway_length)
+                  for row in (d-1, d))
+  return float((1-ratio_2)*lower + ratio_2*upper)
+
+def test_density_ratio_on_a_node_is_on_the_chart():
+  # 0.85 is a density ratio row, so the 0.80 row (with -1 cells at 4000 ft) carries no weight
+  density_ratio_calculated, min_go = told.calc_told_batch(139, 300, 58000, 4000)
+  assert density_ratio_calculated == 0.85
+  assert min_go == pytest.approx(150.0)
+  assert told.min_go_on_chart(0.85, 58000, 4000)
+
+def test_runway_between_columns_on_a_density_ratio_node():
+  assert told.calc_min_go_batch(0.85, 56000, 4500) == pytest.approx(132.25, abs=0.005)
+  assert told.calc_min_go_batch(0.85, 56000, 4500) == pytest.approx(reference_min_go(0.85, 56000, 4500), abs=1e-9)
+
+def test_runway_next_to_the_minus_one_region():
+  # the 62000 lbs 0.70 row is -1 up to 6000 ft: its fit must not bend through those cells
+  assert told.calc_min_go_batch(0.70, 62000, 7350) == pytest.approx(reference_min_go(0.70, 62000, 7350), abs=1e-9)
+  assert 145 < told.calc_min_go_batch(0.70, 62000, 7350) < 155
+
+def test_scalar_feasibility_matches_batch():
+  for user_ac_weight, density_ratio_calculated, user_runway_length in [(58000, 0.85, 4000), (56000, 0.85, 4500), (62000, 0.75, 6000), (66000, 0.70, 7000)]:
+    weight_band, ratio_weight, density_ratio_band, ratio_2 = told.min_go_bands(user_ac_weight, density_ratio_calculated)
+    assert told.min_go_feasible(weight_band, ratio_weight, density_ratio_band, ratio_2, user_runway_length) == \
+      bool(told.min_go_on_chart(density_ratio_calculated, user_ac_weight, user_runway_length))
+
+def test_every_chart_node():
+  # on every weight, density ratio and runway node MinGo is the chart cell, off the chart where the cell is -1
+  w, d, r = np.meshgrid(np.arange(1, len(told.weights)), np.arange(len(told.density_ratios)), np.arange(len(told.runway_lengths_array)), indexing='ij')
+  min_go = told.calc_min_go_batch(told.density_ratios[d], told.weights[w], told.runway_lengths_array[r])
+  cells = told.min_go_tensor[w, d, r]
+  np.testing.assert_array_equal(np.isnan(min_go), cells == -1)
+  np.testing.assert_allclose(min_go[cells != -1], cells[cells != -1], atol=1e-9)
+
+@pytest.mark.parametrize('user_ac_weight', told.weights[1:])
+def test_weight_nodes_against_reference(user_ac_weight):
+  # on a weight node, between the density ratio rows and runway columns: wherever none of the blended cells
+  # the runway sits between is -1, MinGo is on the chart and matches the reference
+  density_ratio_values = np.round(np.arange(told.density_ratios[0], told.density_ratios[-1] + 0.001, 0.01), 2)
+  runway_lengths = np.arange(told.runway_lengths_array[0], told.runway_lengths_array[-1] + 1, 500)
+  w = int(np.searchsorted(told.weights, user_ac_weight))
+  for density_ratio_calculated in density_ratio_values:
+    d = max(int(np.searchsorted(told.density_ratios, density_ratio_calculated)), 1)
+    on_row = np.isclose(density_ratio_calculated, told.density_ratios[d])
+    rows = [d] if on_row else [d-1, d]
+    for user_runway_length in runway_lengths:
+      columns = np.flatnonzero(np.abs(told.runway_lengths_array - user_runway_length) < 1000)
+      expected_on_chart = all(told.min_go_tensor[w, row, column] != -1 for row in rows for column in columns)
+      min_go = told.calc_min_go_batch(density_ratio_calculated, user_ac_weight, user_runway_length)
+      assert np.isnan(min_go) != expected_on_chart, (density_ratio_calculated, user_runway_length)
+      if expected_on_chart:
+        assert min_go == pytest.approx(reference_min_go(density_ratio_calculated, user_ac_weight, user_runway_length), abs=1e-9)
+
+def test_limit_solvers_on_a_density_ratio_node():
+  assert told.max_weight_for_min_go(139, 300, 4000, 150) is not None
+  assert told.min_runway_length_for_min_go(139, 300, 58000, 150) == pytest.approx(4000)
+  assert told.min_runway_length_for_min_go(139, 300, 58000, 0) is not None
+
+def test_limit_boundary_without_a_sign_change():
+  # the engine disagrees with the scan at the outside end of the bracket: no sign change, no brentq
+  xs = np.array([0., 1., 2.])
+  min_go = np.array([0., 10., 20.])
+  on_chart = np.ones(3, dtype=bool)
+  assert told._limit_boundary(xs, min_go, on_chart, lambda x: 0.0, 5, largest=True) == 0.0
+  assert told._limit_boundary(xs, min_go, on_chart, lambda x: np.nan, 5, largest=True) == 0.0
+  assert told._limit_boundary(xs, min_go, on_chart, lambda x: 10.0*x, 5, largest=True) == pytest.approx(0.5, abs=1e-3)
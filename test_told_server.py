@@ -0,0 +1,94 @@
+# the json service on a localhost port: single and batch requests against the engine, bad requests, off chart
+# results and the stats counters
+import http.client
+import json
+
+import numpy as np
+import pytest
+
+import answer_cube
+import told
+import told_server
+
+@pytest.fixture
+def server():
+  server = told_server.start_server(cube=None)
+  yield server
+  server.shutdown()
+  server.server_close()
+
+def request(server, method, path, body=None):
+  connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+  try:
+    connection.request(method, path, body=None if body is None else json.dumps(body))
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+  finally:
+    connection.close()
+
+def test_get_min_go(server):
+  status, result = request(server, 'GET', '/min_go?temp=60&alt=0&weight=56000&runway_length=8000')
+  density_ratio, min_go = told.calc_told_batch(60, 0, 56000, 8000)
+  assert status == 200
+  assert result['density_ratio'] == pytest.approx(density_ratio)
+  assert result['min_go'] == pytest.approx(np.round(min_go, 2))
+
+def test_inputs_between_steps_are_computed_exactly(server):
+  # 56500 lbs needs a higher MinGo than 56000 lbs, it must not be answered with the 56000 lbs result
+  request(server, 'GET', '/min_go?temp=90&alt=2000&weight=56000&runway_length=6000')
+  status, result = request(server, 'GET', '/min_go?temp=90&alt=2000&weight=56500&runway_length=6000')
+  assert status == 200
+  assert result['weight'] == 56500
+  assert result['min_go'] == pytest.approx(np.round(told.calc_told_batch(90, 2000, 56500, 6000)[1], 2))
+  assert result['min_go'] > request(server, 'GET', '/min_go?temp=90&alt=2000&weight=56000&runway_length=6000')[1]['min_go']
+
+def test_post_batch(server):
+  scenarios = [{'temp': 60, 'alt': 0, 'weight': 56000, 'runway_length': 8000}, {'temp': 95.5, 'alt': 2350, 'weight': 61200, 'runway_length': 9050}]
+  status, body = request(server, 'POST', '/min_go', {'scenarios': scenarios})
+  assert status == 200
+  density_ratio, min_go = told.calc_told_batch(*np.array([[s[name] for name in ('temp', 'alt', 'weight', 'runway_length')] for s in scenarios]).T)
+  assert [result['density_ratio'] for result in body['results']] == pytest.approx(density_ratio)
+  assert [result['min_go'] for result in body['results']] == pytest.approx(np.round(min_go, 2))
+
+@pytest.mark.parametrize('method, path, body', [
+  ('GET', '/min_go?temp=60&alt=0&weight=56000', None),
+  ('GET', '/min_go?temp=hot&alt=0&weight=56000&runway_length=8000', None),
+  ('GET', '/density_ratio?temp=nan&alt=0', None),
+  ('POST', '/min_go', {'scenario': []}),
+  ('POST', '/min_go', {'scenarios': [1]}),
+])
+def test_bad_requests(server, method, path, body):
+  status, result = request(server, method, path, body)
+  assert status == 400
+  assert result['error']
+
+def test_off_chart_is_null(server):
+  status, result = request(server, 'GET', '/min_go?temp=60&alt=50000&weight=56000&runway_length=8000')
+  assert status == 200
+  assert result['density_ratio'] is None and result['min_go'] is None
+  status, result = request(server, 'GET', '/min_go?temp=139&alt=300&weight=66000&runway_length=4000')
+  assert result['density_ratio'] is not None and result['min_go'] is None
+
+def test_stats(server):
+  for _ in range(2):
+    request(server, 'GET', '/density_ratio?temp=60&alt=0')
+  request(server, 'GET', '/density_ratio?temp=60')
+  status, stats = request(server, 'GET', '/stats')
+  assert status == 200
+  assert stats['chart_data_hash'] == told.chart_data_hash
+  assert stats['requests'] == 3 and stats['errors'] == 1
+  assert stats['cache']['hits'] == 1 and stats['cache']['misses'] == 1
+  assert stats['answer_cube'] is None
+
+def test_answer_cube_only_answers_inputs_on_the_steps():
+  cube = answer_cube.load_answer_cube()
+  if cube is None:
+    pytest.skip('answer cube not built')
+  server = told_server.start_server(cube=cube)
+  try:
+    for weight in (56000, 56500):
+      result = request(server, 'GET', f'/min_go?temp=90&alt=2000&weight={weight}&runway_length=6000')[1]
+      assert result['min_go'] == pytest.approx(np.round(told.calc_told_batch(90, 2000, weight, 6000)[1], 2))
+  finally:
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,60 @@
+# the METAR/SPECI/TAF parsing of the drop directory and which report of a station is used
+import os
+
+import pytest
+
+import wx_ingest
+
+metar = 'METAR KNUW 011756Z 18008G15KT 10SM R07/2400FT FEW025 BKN200 M02/M07 A3002 RMK AO2 SLP170 T10221072='
+speci = 'SPECI KNUW 011820Z 17010KT 1/2SM BR OVC004 M02/M03 A3001 RMK AO2='
+taf = '''TAF AMD KNUW 011720Z 0118/0218 18010KT P6SM BKN025 TX31/0122Z TNM04/0214Z
+  FM012200 20012G20KT P6SM SCT030
+  TEMPO 0200/0204 3SM -SHRA BKN015='''
+
+def test_report_start():
+  text = '\n'.join([metar, speci, taf, 'METAR COR KSEA 011753Z 00000KT 10SM CLR 13/02 A3020=', 'KBFI 011753Z 00000KT 10SM CLR 14/M01 A3020='])
+  starts = [match.groups() for match in wx_ingest._report_start.finditer(text)]
+  assert starts == [('METAR', 'KNUW', '011756'), ('SPECI', 'KNUW', '011820'), ('TAF', 'KNUW', '011720'), ('METAR', 'KSEA', '011753'),
+                    (None, 'KBFI', '011753')]
+
+def test_metar_temperature():
+  # not the RVR group, the visibility fraction or the dewpoint
+  assert wx_ingest._metar_temperature.search(metar).group(1) == 'M02'
+  assert wx_ingest._metar_temperature.search(speci).group(1) == 'M02'
+  assert wx_ingest._metar_temperature.search('METAR KNUW 011856Z 18008KT 10SM CLR 31/ A3002').groups() == ('31', None)
+
+def test_taf_max_temperature():
+  assert wx_ingest._taf_max_temperature.findall(taf) == ['31']
+  assert wx_ingest._taf_max_temperature.findall('TAF KNUW 011720Z 0118/0218 TXM01/0121Z TX02/0221Z TNM08/0213Z') == ['M01', '02']
+
+def test_parse_reports():
+  reports = wx_ingest.parse_reports('\n'.join([metar, speci, taf]))
+  assert [(report['kind'], report['issued']) for report in reports] == [('METAR', '011756'), ('SPECI', '011820'), ('TAF', '011720')]
+  assert [report['temp_f'] for report in reports] == pytest.approx([28.4, 28.4, 87.8])
+
+def write(path, text, mtime):
+  path.write_text(text)
+  os.utime(path, (mtime, mtime))
+
+def test_latest_report_is_the_latest_issued(tmp_path):
+  # a TAF issued before the SPECI, but written to a newer file, does not replace it
+  write(tmp_path / 'knuw.metar', speci, 1000)
+  write(tmp_path / 'knuw.taf', taf, 2000)
+  drop = wx_ingest.DropDirectory(str(tmp_path))
+  drop.scan()
+  [report] = drop.latest_reports()
+  assert (report['kind'], report['issued']) == ('SPECI', '011820')
+
+def test_observation_preferred_over_taf_of_the_same_time(tmp_path):
+  write(tmp_path / 'knuw.metar', metar.replace('011756Z', '011720Z'), 1000)
+  write(tmp_path / 'knuw.taf', taf, 2000)
+  drop = wx_ingest.DropDirectory(str(tmp_path))
+  drop.scan()
+  assert [report['kind'] for report in drop.latest_reports()] == ['METAR']
+
+def test_newer_file_breaks_ties(tmp_path):
+  write(tmp_path / 'a.metar', metar, 1000)
+  write(tmp_path / 'b.metar', metar.replace('M02/M07', '01/M07'), 2000)
+  drop = wx_ingest.DropDirectory(str(tmp_path))
+  drop.scan()
+  assert [report['temp_f'] for report in drop.latest_reports()] == pytest.approx([33.8])
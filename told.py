@@ -0,0 +1,292 @@
+# PCL chart data and lookup engine for the Growler TOLD app.
+# this module is imported (not re-run) by streamlit, so everything built here
+# is created once per process instead of on every rerun of main()
+import os
+
+import numpy as np
+
+import chart_data
+import spline
+
+# the PCL chart tables, edited in data/pcl_charts.json and built into data/pcl_charts.bin by
+# build_chart_data.py. the arrays are read-only views straight onto the mapped file
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+chart_data_path = os.path.join(data_dir, 'pcl_charts.bin')
+charts = chart_data.load_chart_data(chart_data_path)
+# content hash of the chart tables, part of every cache key built from them
+chart_data_hash = charts.sha256
+
+# x axis values for density ratio chart
+dr_temp_x_input_tendegrees = charts['dr_temps']
+dr_temp_x_input_onedegrees = np.arange(dr_temp_x_input_tendegrees[0], dr_temp_x_input_tendegrees[-1]+1)
+
+runway_lengths_array = charts['runway_lengths']
+rwl_expanded = np.arange(runway_lengths_array[0], runway_lengths_array[-1], 100)
+
+# axes of the lookup tables, all ascending so bands can be found with searchsorted
+altitudes = charts['altitudes']
+weights = charts['weights']
+density_ratios = charts['density_ratios']
+# spacing of the density ratio rows on the MinGo charts
+density_ratio_step = 0.05
+
+# density ratio curves stacked as (altitude, temperature)
+dr_curves = charts['dr_curves']
+# MinGo charts stacked as (weight, density_ratio, runway_length), -1 marks a cell off the chart
+min_go_tensor = charts['min_go']
+
+def _runway_boundary(min_go_tensor):
+  # the -1 cells of every density ratio row are its shortest runway lengths, so each row is on the chart from
+  # one runway column onwards: (weight, density_ratio) -> that column, len(runway_lengths_array) for none
+  off_chart = min_go_tensor == -1
+  if (np.diff(off_chart.astype(np.int8), axis=2) > 0).any():
+    raise ValueError('off chart (-1) MinGo cells must be the shortest runway lengths of their row')
+  return np.where(off_chart.all(axis=2), off_chart.shape[2], off_chart.argmin(axis=2))
+
+# every chart curve fitted as a quadratic spline by build_chart_data.py, (..., pieces, 3) coefficients over
+# shared breakpoints. blends of curves are blends of these coefficients, so no curve is fitted per query
+dr_breaks, dr_coefficients = charts['dr_breaks'], charts['dr_coefficients']
+min_go_breaks, min_go_coefficients = charts['min_go_breaks'], charts['min_go_coefficients']
+
+# feasibility boundary of the -1 cells, for every weight a sorted array over the density ratio rows (the
+# boundary only moves to shorter runways as the density ratio rises)
+runway_boundary = _runway_boundary(min_go_tensor)
+# a blend ratio this close to 0 or 1 puts the input on a chart node, so the chart on the far side carries no weight
+node_tolerance = 1e-9
+
+def _band(axis, value, include_first=True):
+  # index of the upper node of the (lower, upper] band holding value, None when off the chart
+  # with include_first the lowest band also takes its lower node
+  if not axis[0] <= value <= axis[-1] or (value == axis[0] and not include_first):
+    return None
+  return max(int(np.searchsorted(axis, value)), 1)
+
+def density_ratio_band(user_alt):
+  # altitude band holding the field elevation and how far through it, None when it is off the chart
+  i = _band(altitudes, user_alt)
+  if i is None:
+    return None
+  return i, float((user_alt-altitudes[i-1])/(altitudes[i]-altitudes[i-1]))
+
+def blend_density_ratio_curve(altitude_band, ratio):
+  # blend the two altitude curves either side of the field elevation
+  return (1-ratio)*dr_curves[altitude_band-1] + (ratio)*dr_curves[altitude_band]
+
+def density_ratio_spline(altitude_band, ratio):
+  # the blended density ratio curve as a quadratic spline, blended from the fitted altitude curves
+  coefficients = (1-ratio)*dr_coefficients[altitude_band-1] + (ratio)*dr_coefficients[altitude_band]
+  return spline.QuadraticSpline(dr_breaks, coefficients)
+
+def min_go_bands(user_ac_weight, density_ratio_calculated):
+  # weight band and density ratio band with how far through each, None when either is off the charts
+  w = _band(weights, user_ac_weight, include_first=False)
+  d = _band(density_ratios, density_ratio_calculated)
+  if w is None or d is None:
+    return None
+  ratio_weight = float((user_ac_weight-weights[w-1])/(weights[w]-weights[w-1]))
+  ratio_2 = (density_ratio_calculated-density_ratios[d-1])/density_ratio_step
+  return w, ratio_weight, d, ratio_2
+
+def _runway_on_chart(weight_band, ratio_weight, density_ratio_band, ratio_2, user_runway_length):
+  # whether the runway sits past the -1 cells of every chart the blend around the weight and density ratio
+  # gives weight to. an input on a node blends in only the chart on it, and a runway length on a column is
+  # read from the column band above it
+  w, d = weight_band, density_ratio_band
+  lower_weight, upper_weight = ratio_weight < 1 - node_tolerance, ratio_weight > node_tolerance
+  lower_row, upper_row = ratio_2 < 1 - node_tolerance, ratio_2 > node_tolerance
+  boundary = np.maximum.reduce([
+    np.where(lower_weight & lower_row, runway_boundary[w-1, d-1], 0), np.where(upper_weight & lower_row, runway_boundary[w, d-1], 0),
+    np.where(lower_weight & upper_row, runway_boundary[w-1, d], 0), np.where(upper_weight & upper_row, runway_boundary[w, d], 0),
+  ])
+  column = np.clip(np.searchsorted(runway_lengths_array, user_runway_length, side='right') - 1, 0, len(runway_lengths_array)-1)
+  return column >= boundary
+
+def min_go_feasible(weight_band, ratio_weight, density_ratio_band, ratio_2, user_runway_length):
+  # whether MinGo in these bands at this runway length comes from real chart values rather than -1 cells,
+  # checked before any interpolation runs
+  return bool(_runway_on_chart(weight_band, ratio_weight, density_ratio_band, ratio_2, user_runway_length))
+
+def blend_min_go_curves(weight_band, ratio_weight, density_ratio_band):
+  # blend the weight charts either side of the aircraft weight at the density ratio rows either side
+  # of the calculated density ratio
+  w, d = weight_band, density_ratio_band
+  interp_ys_lower_weightcurve = (1-ratio_weight)*min_go_tensor[w-1, d-1] + (ratio_weight)*min_go_tensor[w, d-1]
+  interp_ys_upper_weightcurve = (1-ratio_weight)*min_go_tensor[w-1, d] + (ratio_weight)*min_go_tensor[w, d]
+  return interp_ys_lower_weightcurve, interp_ys_upper_weightcurve
+
+def min_go_splines(weight_band, ratio_weight, density_ratio_band):
+  # the blended lower and upper MinGo curves as quadratic splines, blended from the fitted charts
+  w, d = weight_band, density_ratio_band
+  lower = (1-ratio_weight)*min_go_coefficients[w-1, d-1] + (ratio_weight)*min_go_coefficients[w, d-1]
+  upper = (1-ratio_weight)*min_go_coefficients[w-1, d] + (ratio_weight)*min_go_coefficients[w, d]
+  return spline.QuadraticSpline(min_go_breaks, lower), spline.QuadraticSpline(min_go_breaks, upper)
+
+# dense density ratio grid on every degree and every 100 ft of field elevation, built offline by
+# build_density_ratio_grid.py with the same interpolation the app uses. the file name carries the chart
+# data hash, so a grid built from older charts is never picked up
+grid_temps = dr_temp_x_input_onedegrees
+grid_altitude_step = 100
+grid_altitudes = np.arange(altitudes[0], altitudes[-1]+1, grid_altitude_step)
+density_ratio_grid_path = os.path.join(data_dir, f'density_ratio_grid-{chart_data_hash[:12]}.npy')
+
+def _load_density_ratio_grid():
+  # memory-map the grid read-only so every server process shares one page-cache copy, None if it has not been built
+  try:
+    grid = np.load(density_ratio_grid_path, mmap_mode='r')
+  except FileNotFoundError:
+    return None
+  if grid.shape != (len(grid_altitudes), len(grid_temps)):
+    return None
+  return grid
+
+density_ratio_grid = _load_density_ratio_grid()
+
+def _grid_index(user_temp, user_alt):
+  # flat index into the density ratio grid and a mask of the inputs that land on a grid node
+  row = (user_alt-grid_altitudes[0])/grid_altitude_step
+  col = user_temp-grid_temps[0]
+  on_grid = ((row == np.floor(row)) & (0 <= row) & (row < len(grid_altitudes)) &
+             (col == np.floor(col)) & (0 <= col) & (col < len(grid_temps)))
+  return np.where(on_grid, row*len(grid_temps) + col, 0).astype(int), on_grid
+
+def grid_density_ratio(user_temp, user_alt):
+  # density ratio read straight from the grid, None when the grid is missing or the inputs are not on a node
+  if density_ratio_grid is None:
+    return None
+  index, on_grid = _grid_index(np.float64(user_temp), np.float64(user_alt))
+  if not on_grid:
+    return None
+  return density_ratio_grid.reshape(-1)[index]
+
+def bands(axis, values, include_first=True):
+  # vectorized _band: upper node index of each value's band plus a mask of the values on the chart
+  on_chart = (axis[0] <= values) & (values <= axis[-1])
+  if not include_first:
+    on_chart &= values != axis[0]
+  return np.clip(np.searchsorted(axis, values), 1, len(axis)-1), on_chart
+
+def calc_density_ratio_batch(user_temp, user_alt):
+  # density ratio for arrays of temperatures and field elevations, nan where either is off the chart
+  user_temp, user_alt = np.broadcast_arrays(np.asarray(user_temp, dtype=float), np.asarray(user_alt, dtype=float))
+  shape = user_temp.shape
+  user_temp, user_alt = user_temp.ravel(), user_alt.ravel()
+  on_chart = bands(altitudes, user_alt)[1] & np.isfinite(user_temp)
+  density_ratio_calculated = np.full(user_temp.shape, np.nan)
+
+  # inputs on the precomputed grid are a single read, only the rest are interpolated
+  interpolate_rows = on_chart
+  if density_ratio_grid is not None:
+    index, on_grid = _grid_index(user_temp, user_alt)
+    density_ratio_calculated[on_grid] = density_ratio_grid.reshape(-1)[index[on_grid]]
+    interpolate_rows = on_chart & ~on_grid
+  if not interpolate_rows.any():
+    return density_ratio_calculated.reshape(shape)
+
+  # scenarios at the same field elevation share one blended curve, blended the same way as density_ratio_spline
+  # so the results match the scalar path exactly
+  alts, rows = np.unique(user_alt[interpolate_rows], return_inverse=True)
+  i = bands(altitudes, alts)[0]
+  ratio = ((alts-altitudes[i-1])/(altitudes[i]-altitudes[i-1]))[:, None, None]
+  coefficients = (1-ratio)*dr_coefficients[i-1] + (ratio)*dr_coefficients[i]
+  dr = spline.evaluate(dr_breaks, coefficients, user_temp[interpolate_rows], rows)
+  density_ratio_calculated[interpolate_rows] = np.round(dr, 2)
+  return density_ratio_calculated.reshape(shape)
+
+def calc_min_go_batch(density_ratio_calculated, user_ac_weight, user_runway_length):
+  # MinGo for arrays of density ratios, weights and runway lengths, nan where any of them is off the charts or
+  # the scenario falls in the -1 cells; those rows are found from the feasibility boundary and never interpolated
+  density_ratio_calculated, user_ac_weight, user_runway_length = np.broadcast_arrays(
+    np.asarray(density_ratio_calculated, dtype=float), np.asarray(user_ac_weight, dtype=float), np.asarray(user_runway_length, dtype=float))
+  shape = density_ratio_calculated.shape
+  density_ratio_calculated, user_ac_weight, user_runway_length = density_ratio_calculated.ravel(), user_ac_weight.ravel(), user_runway_length.ravel()
+  weight_band, weight_on_chart = bands(weights, user_ac_weight, include_first=False)
+  d, dr_on_chart = bands(density_ratios, density_ratio_calculated)
+  ratio_weight = (user_ac_weight-weights[weight_band-1])/(weights[weight_band]-weights[weight_band-1])
+  ratio_2 = (density_ratio_calculated-density_ratios[d-1])/density_ratio_step
+  on_chart = weight_on_chart & dr_on_chart & np.isfinite(user_runway_length) & _runway_on_chart(weight_band, ratio_weight, d, ratio_2, user_runway_length)
+
+  # scenarios with the same weight and density ratio band share their lower and upper curves
+  ws, weight_rows = np.unique(np.where(on_chart, user_ac_weight, weights[-1]), return_inverse=True)
+  pairs, rows = np.unique(weight_rows*len(density_ratios) + d, return_inverse=True)
+  pair_weight, pair_d = ws[pairs // len(density_ratios)], pairs % len(density_ratios)
+  w = bands(weights, pair_weight)[0]
+  ratio_weight = ((pair_weight-weights[w-1])/(weights[w]-weights[w-1]))[:, None, None]
+  lower = (1-ratio_weight)*min_go_coefficients[w-1, pair_d-1] + (ratio_weight)*min_go_coefficients[w, pair_d-1]
+  upper = (1-ratio_weight)*min_go_coefficients[w-1, pair_d] + (ratio_weight)*min_go_coefficients[w, pair_d]
+
+  user_runway_length = np.where(on_chart, user_runway_length, runway_lengths_array[0])
+  min_go_calculated_lower = spline.evaluate(min_go_breaks, lower, user_runway_length, rows)
+  min_go_calculated_upper = spline.evaluate(min_go_breaks, upper, user_runway_length, rows)
+  final_min_go = (1-ratio_2)*min_go_calculated_lower + ratio_2*min_go_calculated_upper
+  return np.where(on_chart, final_min_go, np.nan).reshape(shape)
+
+def calc_told_batch(user_temp, user_alt, user_ac_weight, user_runway_length):
+  # density ratio and MinGo for arrays of scenarios in one vectorized pass
+  density_ratio_calculated = calc_density_ratio_batch(user_temp, user_alt)
+  return density_ratio_calculated, calc_min_go_batch(density_ratio_calculated, user_ac_weight, user_runway_length)
+
+def on_min_go_charts(density_ratio_calculated, user_ac_weight):
+  # mask of the scenarios whose weight and density ratio are on the MinGo charts, whatever the runway length
+  return bands(weights, user_ac_weight, include_first=False)[1] & bands(density_ratios, density_ratio_calculated)[1]
+
+def min_go_on_chart(density_ratio_calculated, user_ac_weight, user_runway_length):
+  # mask of the scenarios whose MinGo comes from real chart values: the weight and density ratio are on the
+  # charts and none of the chart cells around the scenario is a -1 (off chart) cell
+  density_ratio_calculated, user_ac_weight, user_runway_length = np.broadcast_arrays(
+    np.asarray(density_ratio_calculated, dtype=float), np.asarray(user_ac_weight, dtype=float), np.asarray(user_runway_length, dtype=float))
+  w, weight_on_chart = bands(weights, user_ac_weight, include_first=False)
+  d, dr_on_chart = bands(density_ratios, density_ratio_calculated)
+  ratio_weight = (user_ac_weight-weights[w-1])/(weights[w]-weights[w-1])
+  ratio_2 = (density_ratio_calculated-density_ratios[d-1])/density_ratio_step
+  return weight_on_chart & dr_on_chart & np.isfinite(user_runway_length) & _runway_on_chart(w, ratio_weight, d, ratio_2, user_runway_length)
+
+# inverse queries: the heaviest weight or shortest runway that keeps MinGo within a limit. the free input is
+# scanned in one batched pass at the app's input step to bracket the boundary, which is then refined with
+# brentq. MinGo is linear in weight inside a weight band and off chart cells switch on and off at chart nodes,
+# so the scan only has to bracket the answer, not find it
+inverse_weight_step = 100
+inverse_runway_step = 100
+
+def _limit_boundary(xs, min_go, on_chart, evaluate, min_go_limit, largest):
+  # the largest (or smallest) scanned x with MinGo within the limit, refined towards its neighbour outside it.
+  # the small tolerance keeps float noise around a limit of 0 inside it, and brentq solves against the same
+  # threshold so the scanned bracket changes sign
+  threshold = min_go_limit + 1e-6
+  within = on_chart & (min_go <= threshold)
+  if not within.any():
+    return None
+  i = np.flatnonzero(within)[-1 if largest else 0]
+  j = i + 1 if largest else i - 1
+  if not 0 <= j < len(xs) or not on_chart[j]:
+    # the neighbour is off the chart or past its end, the answer is the last scanned point inside
+    return float(xs[i])
+  f = lambda x: evaluate(x) - threshold
+  if not f(xs[i]) <= 0 < f(xs[j]):
+    # the engine disagrees with the scan at an end of the bracket (or is off the chart there), so there is no
+    # sign change to refine and the answer is the last scanned point inside
+    return float(xs[i])
+  # scipy is slow to import and only the inverse queries need it
+  from scipy import optimize
+  return float(optimize.brentq(f, xs[i], xs[j], xtol=1e-3))
+
+def max_weight_for_min_go(user_temp, user_alt, user_runway_length, min_go_limit):
+  # heaviest weight on the charts whose MinGo stays at or under min_go_limit, None when no weight does
+  density_ratio_calculated = calc_density_ratio_batch(user_temp, user_alt)
+  if np.isnan(density_ratio_calculated):
+    return None
+  xs = np.arange(weights[0], weights[-1] + inverse_weight_step, inverse_weight_step, dtype=float)
+  min_go = calc_min_go_batch(density_ratio_calculated, xs, user_runway_length)
+  on_chart = min_go_on_chart(density_ratio_calculated, xs, user_runway_length)
+  evaluate = lambda weight: float(calc_min_go_batch(density_ratio_calculated, weight, user_runway_length))
+  return _limit_boundary(xs, min_go, on_chart, evaluate, min_go_limit, largest=True)
+
+def min_runway_length_for_min_go(user_temp, user_alt, user_ac_weight, min_go_limit):
+  # shortest runway on the charts whose MinGo stays at or under min_go_limit, None when no runway does
+  density_ratio_calculated = calc_density_ratio_batch(user_temp, user_alt)
+  if np.isnan(density_ratio_calculated):
+    return None
+  xs = np.arange(runway_lengths_array[0], runway_lengths_array[-1] + inverse_runway_step, inverse_runway_step, dtype=float)
+  min_go = calc_min_go_batch(density_ratio_calculated, user_ac_weight, xs)
+  on_chart = min_go_on_chart(density_ratio_calculated, user_ac_weight, xs)
+  evaluate = lambda runway_length: float(calc_min_go_batch(density_ratio_calculated, user_ac_weight, runway_length))
+  return _limit_boundary(xs, min_go, on_chart, evaluate, min_go_limit, largest=False)
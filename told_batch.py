@@ -0,0 +1,86 @@
+# headless batch runner for the TOLD charts: streams scenario rows from a CSV or Parquet file
+# through the vectorized engine in told.py and writes density ratio and MinGo for every row
+# without starting streamlit, e.g.
+#
+#   python told_batch.py scenarios.csv results.parquet
+#
+# rows are read, computed and written one chunk at a time so memory stays flat for any input size
+import argparse
+import resource
+import sys
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+import told
+
+def is_parquet(path):
+  return path.lower().endswith(('.parquet', '.pq'))
+
+def read_chunks(path, chunk_size, columns=()):
+  # yield record batches of at most chunk_size rows
+  if is_parquet(path):
+    batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+  else:
+    # csv blocks are sized in bytes, so cut them back down to chunk_size rows. arrow infers column types from
+    # the first block, so the input columns are read as floats or a later 60.5 fails an inferred int64 column
+    batches = pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=max(chunk_size*32, 1 << 16)),
+      convert_options=pa_csv.ConvertOptions(column_types={name: pa.float64() for name in columns}))
+  for batch in batches:
+    for offset in range(0, batch.num_rows, chunk_size):
+      yield batch.slice(offset, chunk_size)
+
+def open_writer(path, schema):
+  if is_parquet(path):
+    return pq.ParquetWriter(path, schema)
+  return pa_csv.CSVWriter(path, schema)
+
+def compute_chunk(batch, columns):
+  # run one chunk through the engine and append the results as new columns
+  inputs = [batch.column(name).to_numpy(zero_copy_only=False).astype(float) for name in columns]
+  density_ratio, min_go = told.calc_told_batch(*inputs)
+  return pa.RecordBatch.from_arrays(
+    batch.columns + [pa.array(density_ratio, from_pandas=True), pa.array(np.round(min_go, 2) + 0.0, from_pandas=True)],
+    names=batch.schema.names + ['density_ratio', 'min_go'])
+
+def peak_rss_mb():
+  # ru_maxrss is in kilobytes on linux and bytes on macos
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return peak/(1 << 20) if sys.platform == 'darwin' else peak/(1 << 10)
+
+def run(input_path, output_path, columns, chunk_size):
+  rows = 0
+  writer = None
+  start = time.perf_counter()
+  try:
+    for batch in read_chunks(input_path, chunk_size, columns):
+      result = compute_chunk(batch, columns)
+      if writer is None:
+        writer = open_writer(output_path, result.schema)
+      writer.write_batch(result)
+      rows += result.num_rows
+  finally:
+    if writer is not None:
+      writer.close()
+  return rows, time.perf_counter() - start
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Compute density ratio and MinGo for every scenario in a CSV or Parquet file.')
+  parser.add_argument('input', help='scenario file (.csv or .parquet)')
+  parser.add_argument('output', help='result file (.csv or .parquet)')
+  parser.add_argument('--chunk-size', type=int, default=65536, help='rows per chunk (default 65536)')
+  parser.add_argument('--temp-col', default='temp', help='temperature (F) column')
+  parser.add_argument('--alt-col', default='alt', help='field elevation (ft) column')
+  parser.add_argument('--weight-col', default='weight', help='aircraft weight (lbs) column')
+  parser.add_argument('--runway-col', default='runway_length', help='runway length (ft) column')
+  args = parser.parse_args(argv)
+
+  columns = [args.temp_col, args.alt_col, args.weight_col, args.runway_col]
+  rows, elapsed = run(args.input, args.output, columns, args.chunk_size)
+  print(f'{rows} rows in {elapsed:.2f} s ({rows/max(elapsed, 1e-9):,.0f} rows/s), peak RSS {peak_rss_mb():.1f} MB', file=sys.stderr)
+
+if __name__ == '__main__':
+  main()
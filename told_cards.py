@@ -0,0 +1,261 @@
+# kneeboard TOLD cards: a MinGo table over temperature and gross weight for every field and runway, with the
+# density ratio of every temperature row, e.g.
+#
+#   python told_cards.py cards.csv cards/ --format pdf --format png --workers 4
+#
+# cards.csv has a row per card with columns field, elevation_ft, runway_length_ft and optionally runway (the
+# runway's name), or with --airports/--runways every open runway of the --ident fields is carded from the
+# airfield database. the tables of every card are computed in one pass of the batch engine, then the cards are
+# laid out and written in a process pool, pdf as vector text and lines with the standard pdf fonts and png
+# rasterized with pillow. cards.json in the output directory lists every card with how long it took
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import told
+
+formats = ('pdf', 'png')
+# a 5.5 x 8.5 in kneeboard card, laid out in points (1/72 in) and rasterized at png_dpi for png
+card_size = (396, 612)
+margin = 14
+png_dpi = 200
+default_temps = '0:120:10'
+default_weights = '38000:66000:4000'
+
+def parse_range(text):
+  # first:last:step as an inclusive array
+  first, last, step = (float(part) for part in text.split(':'))
+  return np.arange(first, last + step/2, step)
+
+def read_cards(path):
+  # a card dict per csv row
+  cards = []
+  with open(path, newline='') as f:
+    for line, row in enumerate(csv.DictReader(f), start=2):
+      try:
+        cards.append({'field': row['field'].strip(), 'runway': (row.get('runway') or '').strip(),
+                      'elevation_ft': float(row['elevation_ft']), 'runway_length_ft': float(row['runway_length_ft'])})
+      except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError(f'{path}:{line}: every row needs field, elevation_ft and runway_length_ft')
+  return cards
+
+def airfield_cards(airports_path, runways_path, idents):
+  # a card for every open runway of the given fields
+  import airfields
+  db = airfields.load_airfields(airports_path, runways_path)
+  cards = []
+  for ident in idents:
+    matches = [i for i in db.search(ident) if db.ident[i].decode() == ident.upper()]
+    if not matches:
+      raise ValueError(f'{ident} is not in the airfield database')
+    i = matches[0]
+    if np.isnan(db.elevation_ft[i]):
+      raise ValueError(f'{ident} has no field elevation in the airfield database')
+    for runway, length in db.runways(i):
+      cards.append({'field': ident.upper(), 'runway': runway, 'elevation_ft': float(db.elevation_ft[i]), 'runway_length_ft': float(length)})
+  return cards
+
+def card_tables(cards, temps, weights):
+  # density ratio (cards, temps) and MinGo (cards, temps, weights) of every card, nan off the charts
+  elevations = np.array([card['elevation_ft'] for card in cards], dtype=float)[:, None, None]
+  runway_lengths = np.array([card['runway_length_ft'] for card in cards], dtype=float)[:, None, None]
+  density_ratio, min_go = told.calc_told_batch(temps[None, :, None], elevations, weights[None, None, :], runway_lengths)
+  on_chart = told.min_go_on_chart(density_ratio, weights[None, None, :], runway_lengths)
+  return density_ratio[:, :, 0], np.where(on_chart, min_go, np.nan)
+
+def card_name(n, card):
+  slug = re.sub(r'[^A-Za-z0-9]+', '-', f"{card['field']} {card['runway'] or int(card['runway_length_ft'])}").strip('-')
+  return f'{n:03d}-{slug}'
+
+def _cell(value, digits):
+  return 'OFF' if np.isnan(value) else f'{value:z.{digits}f}'
+
+def card_layout(card, temps, weights, density_ratio, min_go):
+  # the card as drawing operations in points from the top left, shared by the pdf and png writers:
+  #   ('text', x, y, text, size, font, centered)   y is the middle of the line, font 'mono', 'sans' or 'bold'
+  #   ('rect', x0, y0, x1, y1, fill gray or None, line width)
+  #   ('line', x0, y0, x1, y1, line width)
+  width, height = card_size
+  runway = f" RWY {card['runway']}" if card['runway'] else ''
+  ops = [
+    ('text', margin, margin + 10, f"{card['field']}{runway}", 18, 'bold', False),
+    ('text', margin, margin + 32, f"Field elevation {card['elevation_ft']:,.0f} ft    Runway {card['runway_length_ft']:,.0f} ft", 10, 'sans', False),
+    ('text', margin, margin + 46, 'MinGo (kts), MAX thrust, dry runway', 10, 'sans', False),
+  ]
+
+  # a temperature column, a density ratio column and a column per weight
+  columns = ['Temp F', 'DR'] + [f'{weight/1000:g}k' for weight in weights]
+  column_width = (width - 2*margin)/len(columns)
+  row_height = min(20, (height - 2*margin - 110)/(len(temps) + 1))
+  top = margin + 62
+  bottom = top + (len(temps) + 1)*row_height
+  for row in range(len(temps) + 1):
+    y = top + row*row_height
+    if row == 0 or row % 2 == 0:
+      ops.append(('rect', margin, y, width - margin, y + row_height, 0.85 if row == 0 else 0.95, None))
+    cells = columns if row == 0 else [f'{temps[row-1]:g}', _cell(density_ratio[row-1], 2)] + [_cell(value, 1) for value in min_go[row-1]]
+    for column, text in enumerate(cells):
+      ops.append(('text', margin + (column + 0.5)*column_width, y + row_height/2, text, 9, 'mono', True))
+  ops.append(('rect', margin, top, width - margin, bottom, None, 1))
+  for column in (1, 2):
+    x = margin + column*column_width
+    ops.append(('line', x, top, x, bottom, 1 if column == 2 else 0.5))
+
+  ops.append(('text', margin, height - margin - 18, 'Always reference the PCL charts for official TOLD data.', 7, 'sans', False))
+  ops.append(('text', margin, height - margin - 8, f'OFF: outside the charts.  Chart data {told.chart_data_hash[:12]}', 7, 'sans', False))
+  return ops
+
+# the pdf standard fonts for each layout font. courier glyphs are all 0.6 em wide, so centered text needs no
+# font metrics
+pdf_fonts = {'mono': 'Courier', 'sans': 'Helvetica', 'bold': 'Helvetica-Bold'}
+
+def _pdf_string(text):
+  text = text.encode('latin-1', 'replace').decode('latin-1')
+  return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+def write_pdf(path, ops):
+  # a one page vector pdf of the layout, with the standard fonts so nothing is embedded
+  width, height = card_size
+  names = {font: f'F{n}' for n, font in enumerate(pdf_fonts, start=1)}
+  content = []
+  for op in ops:
+    if op[0] == 'text':
+      _, x, y, text, size, font, centered = op
+      if centered:
+        x -= 0.6*size*len(text)/2
+      content.append(f'0 g BT /{names[font]} {size} Tf {x:.2f} {height - y - 0.35*size:.2f} Td {_pdf_string(text)} Tj ET')
+    elif op[0] == 'rect':
+      _, x0, y0, x1, y1, fill, line_width = op
+      box = f'{x0:.2f} {height - y1:.2f} {x1 - x0:.2f} {y1 - y0:.2f} re'
+      if fill is not None:
+        content.append(f'{fill} g {box} f')
+      if line_width:
+        content.append(f'0 G {line_width} w {box} S')
+    else:
+      _, x0, y0, x1, y1, line_width = op
+      content.append(f'0 G {line_width} w {x0:.2f} {height - y0:.2f} m {x1:.2f} {height - y1:.2f} l S')
+  stream = '\n'.join(content).encode('latin-1')
+
+  fonts = ' '.join(f'/{names[font]} {n} 0 R' for n, font in enumerate(pdf_fonts, start=5))
+  objects = [
+    b'<< /Type /Catalog /Pages 2 0 R >>',
+    b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+    f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] /Resources << /Font << {fonts} >> >> /Contents 4 0 R >>'.encode(),
+    b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream',
+  ] + [f'<< /Type /Font /Subtype /Type1 /BaseFont /{name} /Encoding /WinAnsiEncoding >>'.encode() for name in pdf_fonts.values()]
+  data = bytearray(b'%PDF-1.4\n')
+  offsets = []
+  for n, body in enumerate(objects, start=1):
+    offsets.append(len(data))
+    data += f'{n} 0 obj\n'.encode() + body + b'\nendobj\n'
+  xref = len(data)
+  data += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+  data += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+  data += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+  with open(path, 'wb') as f:
+    f.write(data)
+
+_png_fonts = {}
+
+def _png_font(size):
+  # pillow's bundled font at a pixel size, loaded once per process
+  from PIL import ImageFont
+  if size not in _png_fonts:
+    _png_fonts[size] = ImageFont.load_default(size=size)
+  return _png_fonts[size]
+
+def write_png(path, ops):
+  # the layout rasterized in grayscale at png_dpi
+  from PIL import Image, ImageDraw
+  scale = png_dpi/72
+  image = Image.new('L', (round(card_size[0]*scale), round(card_size[1]*scale)), 255)
+  draw = ImageDraw.Draw(image)
+  for op in ops:
+    if op[0] == 'text':
+      _, x, y, text, size, font, centered = op
+      draw.text((x*scale, y*scale), text, font=_png_font(round(size*scale)), fill=0, anchor='mm' if centered else 'lm')
+    elif op[0] == 'rect':
+      _, x0, y0, x1, y1, fill, line_width = op
+      draw.rectangle([x0*scale, y0*scale, x1*scale, y1*scale], fill=None if fill is None else round(fill*255),
+                     outline=0 if line_width else None, width=max(1, round((line_width or 0)*scale)))
+    else:
+      _, x0, y0, x1, y1, line_width = op
+      draw.line([x0*scale, y0*scale, x1*scale, y1*scale], fill=0, width=max(1, round(line_width*scale)))
+  image.save(path, 'PNG')
+
+writers = {'pdf': write_pdf, 'png': write_png}
+
+def render_card(path_stem, card_formats, card, temps, weights, density_ratio, min_go):
+  # lay out one card and write it in every format, returns the paths and the seconds it took
+  start = time.perf_counter()
+  ops = card_layout(card, temps, weights, density_ratio, min_go)
+  paths = []
+  for card_format in card_formats:
+    path = f'{path_stem}.{card_format}'
+    writers[card_format](path, ops)
+    paths.append(path)
+  return paths, time.perf_counter() - start
+
+def render_cards(cards, output_dir, card_formats=('pdf',), temps=None, weights=None, workers=None):
+  # compute and write every card, returns a manifest entry per card in order
+  temps = parse_range(default_temps) if temps is None else np.asarray(temps, dtype=float)
+  weights = parse_range(default_weights) if weights is None else np.asarray(weights, dtype=float)
+  os.makedirs(output_dir, exist_ok=True)
+  density_ratio, min_go = card_tables(cards, temps, weights)
+  args = [(os.path.join(output_dir, card_name(n, card)), tuple(card_formats), card, temps, weights, density_ratio[n], min_go[n])
+          for n, card in enumerate(cards)]
+
+  workers = workers or os.cpu_count() or 1
+  if workers == 1 or len(args) == 1:
+    rendered = [render_card(*card_args) for card_args in args]
+  else:
+    # spawned rather than forked workers, as for the Monte Carlo pool
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+      rendered = list(pool.map(render_card, *zip(*args), chunksize=max(1, len(args)//(workers*4))))
+  return [{**card, 'files': [os.path.basename(path) for path in paths], 'render_s': seconds} for card, (paths, seconds) in zip(cards, rendered)]
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Render kneeboard TOLD cards (MinGo over temperature and weight) for many fields and runways.')
+  parser.add_argument('cards', nargs='?', help='csv of field, elevation_ft, runway_length_ft and optionally runway')
+  parser.add_argument('output_dir', help='directory the cards are written to')
+  parser.add_argument('--airports', help='airports csv, with --runways and --ident to card every runway of those fields')
+  parser.add_argument('--runways', help='runways csv of the airfield database')
+  parser.add_argument('--ident', action='append', default=[], help='field to card from the airfield database')
+  parser.add_argument('--format', action='append', choices=formats, help='card file format, repeat for several (default pdf)')
+  parser.add_argument('--temps', default=default_temps, help=f'temperature rows as first:last:step in F (default {default_temps})')
+  parser.add_argument('--weights', default=default_weights, help=f'weight columns as first:last:step in lbs (default {default_weights})')
+  parser.add_argument('--workers', type=int, default=None, help='worker processes (default one per core)')
+  args = parser.parse_args(argv)
+
+  if args.ident and not (args.airports and args.runways):
+    parser.error('--ident needs --airports and --runways')
+  try:
+    cards = read_cards(args.cards) if args.cards else []
+    if args.ident:
+      cards += airfield_cards(args.airports, args.runways, args.ident)
+  except ValueError as e:
+    parser.error(str(e))
+  if not cards:
+    parser.error('no cards: give a cards csv or --ident fields')
+
+  start = time.perf_counter()
+  manifest = render_cards(cards, args.output_dir, args.format or ['pdf'], parse_range(args.temps), parse_range(args.weights), args.workers)
+  elapsed = time.perf_counter() - start
+  with open(os.path.join(args.output_dir, 'cards.json'), 'w') as f:
+    json.dump({'chart_data_hash': told.chart_data_hash, 'seconds': elapsed, 'cards': manifest}, f, indent=2)
+  for entry in manifest:
+    print(f"{entry['render_s']*1e3:8.1f} ms  {', '.join(entry['files'])}", file=sys.stderr)
+  times = [entry['render_s'] for entry in manifest]
+  print(f'{len(manifest)} cards in {elapsed:.2f} s, render p50 {statistics.median(times)*1e3:.1f} ms, max {max(times)*1e3:.1f} ms', file=sys.stderr)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,100 @@
+# Monte Carlo uncertainty for MinGo. temperature and aircraft weight are sampled around the entered values,
+# every sample goes through the batch engine (told.calc_told_batch, the vectorized density_ratio ->
+# interpolate_runway of the app) and the result is the MinGo percentiles plus the probability of landing off the charts, e.g.
+#
+#   python told_montecarlo.py --temp 95 --alt 2000 --weight 60000 --runway-length 8000 \
+#     --temp-spread 5 --weight-spread 2000 --samples 500000 --seed 1 --workers 4
+#
+# the samples are cut into fixed size chunks, each with its own child of the seed, and the chunks are spread
+# over a process pool. a seed gives the same result for any worker count
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import told
+
+distributions = ('uniform', 'normal')
+percentiles = (1, 5, 25, 50, 75, 95, 99)
+# samples per chunk, the unit of work handed to a worker
+chunk_size = 50000
+
+def _offsets(rng, size, spread, distribution):
+  # uniform over +-spread, or normal with +-spread as two standard deviations (about 95% of the samples)
+  if spread <= 0:
+    return np.zeros(size)
+  if distribution == 'normal':
+    return rng.normal(0, spread/2, size)
+  return rng.uniform(-spread, spread, size)
+
+def simulate_chunk(seed, size, user_temp, user_alt, user_ac_weight, user_runway_length, temp_spread, weight_spread, distribution):
+  # MinGo of one chunk of samples, nan for the samples off the charts
+  rng = np.random.default_rng(seed)
+  temps = user_temp + _offsets(rng, size, temp_spread, distribution)
+  ac_weights = user_ac_weight + _offsets(rng, size, weight_spread, distribution)
+  density_ratio, min_go = told.calc_told_batch(temps, user_alt, ac_weights, user_runway_length)
+  return np.where(told.min_go_on_chart(density_ratio, ac_weights, user_runway_length), min_go, np.nan)
+
+def default_workers():
+  return os.cpu_count() or 1
+
+def make_pool(workers=None):
+  # spawned rather than forked workers, the app and the http server fork from a threaded process
+  return ProcessPoolExecutor(max_workers=workers or default_workers(), mp_context=multiprocessing.get_context('spawn'))
+
+def run_monte_carlo(user_temp, user_alt, user_ac_weight, user_runway_length, temp_spread=0, weight_spread=0,
+                    samples=200000, seed=0, distribution='uniform', workers=None, pool=None):
+  # MinGo percentiles and the probability of being off the charts over samples draws. runs on pool when
+  # given, otherwise on a new pool of workers processes, or in this process when workers is 1
+  if distribution not in distributions:
+    raise ValueError(f'distribution must be one of {", ".join(distributions)}')
+  if samples < 1:
+    raise ValueError('samples must be at least 1')
+  sizes = [min(chunk_size, samples - start) for start in range(0, samples, chunk_size)]
+  seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+  args = [(chunk_seed, size, user_temp, user_alt, user_ac_weight, user_runway_length, temp_spread, weight_spread, distribution)
+          for chunk_seed, size in zip(seeds, sizes)]
+
+  if pool is not None:
+    chunks = list(pool.map(simulate_chunk, *zip(*args)))
+  elif (workers or default_workers()) == 1 or len(args) == 1:
+    chunks = [simulate_chunk(*chunk_args) for chunk_args in args]
+  else:
+    with make_pool(workers) as new_pool:
+      chunks = list(new_pool.map(simulate_chunk, *zip(*args)))
+
+  min_go = np.concatenate(chunks)
+  on_chart = min_go[~np.isnan(min_go)]
+  result = {'samples': samples, 'seed': seed, 'off_chart_probability': 1 - len(on_chart)/samples}
+  if len(on_chart):
+    result['mean'] = float(on_chart.mean())
+    result['percentiles'] = dict(zip(percentiles, np.percentile(on_chart, percentiles).tolist()))
+  else:
+    result['mean'] = None
+    result['percentiles'] = dict.fromkeys(percentiles)
+  return result
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Monte Carlo MinGo percentiles for uncertain temperature and weight.')
+  parser.add_argument('--temp', type=float, required=True, help='temperature (F)')
+  parser.add_argument('--alt', type=float, required=True, help='field elevation (ft)')
+  parser.add_argument('--weight', type=float, required=True, help='aircraft weight (lbs)')
+  parser.add_argument('--runway-length', type=float, required=True, help='runway length (ft)')
+  parser.add_argument('--temp-spread', type=float, default=0, help='temperature uncertainty, +-F (default 0)')
+  parser.add_argument('--weight-spread', type=float, default=0, help='weight uncertainty, +-lbs (default 0)')
+  parser.add_argument('--distribution', choices=distributions, default='uniform', help='uniform over +-spread, or normal with +-spread as 2 sigma')
+  parser.add_argument('--samples', type=int, default=200000, help='number of samples (default 200000)')
+  parser.add_argument('--seed', type=int, default=0, help='random seed (default 0)')
+  parser.add_argument('--workers', type=int, default=None, help='worker processes (default one per core)')
+  args = parser.parse_args(argv)
+
+  result = run_monte_carlo(args.temp, args.alt, args.weight, args.runway_length, args.temp_spread, args.weight_spread,
+                           args.samples, args.seed, args.distribution, args.workers)
+  print(f"{result['samples']} samples, seed {result['seed']}, off chart {result['off_chart_probability']:.2%}")
+  for percentile, value in result['percentiles'].items():
+    print(f'  p{percentile:<3} {"off chart" if value is None else f"{value:.2f}"}')
+
+if __name__ == '__main__':
+  main()
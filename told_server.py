@@ -0,0 +1,251 @@
+# small json http service for the TOLD numbers, for EFB clients and scripts that should not scrape the
+# streamlit page. it runs the same engine as the app (told.calc_told_batch matches its density_ratio and
+# interpolate_runway exactly) and listens on localhost by default, e.g.
+#
+#   python told_server.py --port 8502
+#   curl 'localhost:8502/min_go?temp=60&alt=0&weight=56000&runway_length=8000'
+#   curl -d '{"scenarios": [{"temp": 60, "alt": 0, "weight": 56000, "runway_length": 8000}]}' localhost:8502/min_go
+#   curl localhost:8502/stats
+#
+# endpoints
+#   GET  /density_ratio?temp=&alt=                         one density ratio
+#   GET  /min_go?temp=&alt=&weight=&runway_length=         one density ratio and MinGo
+#   POST /density_ratio, /min_go  {"scenarios": [...]}     many at once, computed in one batched pass
+#   GET  /stats                                            request, latency and cache counters
+#   GET  /health
+#
+# every scenario is computed at its exact inputs. results are kept in a bounded LRU with an optional ttl,
+# keyed on the inputs quantized the way the app's are (result_cache.py), so 60 and 60.0 share an entry but
+# 56500 lbs is never answered with 56000. values off the charts come back null. requests are handled by a fixed pool of worker threads, each holding a
+# connection until it closes, so a keep-alive connection idle for idle_timeout seconds is closed to free its
+# worker for the next one. MinGo of inputs on the app's input steps is read from the precomputed answer cube
+# (answer_cube.py) when build_answer_cube.py has been run
+import argparse
+import collections
+import http.server
+import json
+import math
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import answer_cube
+import result_cache
+import told
+
+endpoint_inputs = {
+  '/density_ratio': ('temp', 'alt'),
+  '/min_go': ('temp', 'alt', 'weight', 'runway_length'),
+}
+# most scenarios accepted in one batch request
+max_batch = 100000
+
+class BadRequest(Exception):
+  pass
+
+def number(name, value):
+  # the input as a number, keyed like the app's inputs: on-step values as their step multiple
+  try:
+    value = float(value)
+  except (TypeError, ValueError):
+    raise BadRequest(f'{name} must be a number, got {value!r}')
+  if not math.isfinite(value):
+    raise BadRequest(f'{name} must be finite')
+  return result_cache.quantize(name, value)
+
+def _json_value(value):
+  # nan (off the charts) and the infinities far out on an extrapolated curve become null, json has no
+  # literal for them
+  return float(value) if np.isfinite(value) else None
+
+class LatencyStats:
+  # request count and latency percentiles over the most recent requests
+  def __init__(self, window=10000):
+    self.recent = collections.deque(maxlen=window)
+    self.requests = 0
+    self.errors = 0
+    self.lock = threading.Lock()
+
+  def record(self, seconds, error=False):
+    with self.lock:
+      self.recent.append(seconds)
+      self.requests += 1
+      self.errors += error
+
+  def stats(self):
+    with self.lock:
+      recent = list(self.recent)
+      stats = {'requests': self.requests, 'errors': self.errors}
+    if len(recent) >= 2:
+      cuts = statistics.quantiles(recent, n=100, method='inclusive')
+      stats.update({'p50_ms': cuts[49]*1e3, 'p95_ms': cuts[94]*1e3, 'p99_ms': cuts[98]*1e3, 'mean_ms': statistics.fmean(recent)*1e3})
+    return stats
+
+def compute(endpoint, scenarios, cache, cube=None):
+  # results for a list of scenario dicts, answering what it can from the cache and computing the rest in one
+  # batch, with MinGo read from the answer cube when there is one
+  names = endpoint_inputs[endpoint]
+  keys = []
+  for scenario in scenarios:
+    if not isinstance(scenario, dict):
+      raise BadRequest('every scenario must be an object')
+    missing = [name for name in names if name not in scenario]
+    if missing:
+      raise BadRequest(f'missing {", ".join(missing)}')
+    keys.append((endpoint,) + tuple(number(name, scenario[name]) for name in names))
+
+  results = [cache.get(key) for key in keys]
+  misses = list({key: None for key, result in zip(keys, results) if result is None})
+  if misses:
+    inputs = np.array([key[1:] for key in misses], dtype=float).T
+    if endpoint == '/density_ratio':
+      density_ratio, min_go = told.calc_density_ratio_batch(*inputs), None
+    elif cube is None:
+      density_ratio, min_go = told.calc_told_batch(*inputs)
+    else:
+      # inputs on the input steps and the charts are all in the cube, only the rest go through the engine
+      density_ratio = told.calc_density_ratio_batch(*inputs[:2])
+      min_go, in_cube = cube.lookup(*inputs)
+      if not in_cube.all():
+        min_go[~in_cube] = told.calc_min_go_batch(density_ratio[~in_cube], inputs[2][~in_cube], inputs[3][~in_cube])
+    computed = {}
+    for n, key in enumerate(misses):
+      result = dict(zip(names, key[1:]))
+      result['density_ratio'] = _json_value(density_ratio[n])
+      if min_go is not None:
+        result['min_go'] = _json_value(np.round(min_go[n], 2) + 0.0)
+      computed[key] = result
+      cache.put(key, result)
+    results = [computed[key] if result is None else result for key, result in zip(keys, results)]
+  return results
+
+class ToldRequestHandler(http.server.BaseHTTPRequestHandler):
+  server_version = 'ToldServer/1'
+  protocol_version = 'HTTP/1.1'
+
+  @property
+  def timeout(self):
+    # socket timeout for reading the next request, an idle keep-alive connection is dropped after it
+    return self.server.idle_timeout
+
+  def log_message(self, format, *args):
+    if self.server.verbose:
+      super().log_message(format, *args)
+
+  def send_json(self, status, body):
+    data = json.dumps(body).encode()
+    self.send_response(status)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(data)))
+    self.end_headers()
+    self.wfile.write(data)
+
+  def handle_request(self, read_body):
+    start = time.perf_counter()
+    status = 500
+    try:
+      status, body = self.route(read_body)
+    except BadRequest as e:
+      status, body = 400, {'error': str(e)}
+    except Exception as e:
+      body = {'error': f'{type(e).__name__}: {e}'}
+    finally:
+      self.server.latency.record(time.perf_counter() - start, error=status >= 400)
+    self.send_json(status, body)
+
+  def route(self, read_body):
+    url = urllib.parse.urlsplit(self.path)
+    if url.path == '/health':
+      return 200, {'status': 'ok', 'chart_data_hash': told.chart_data_hash}
+    if url.path == '/stats':
+      return 200, self.server.stats()
+    if url.path not in endpoint_inputs:
+      return 404, {'error': f'no endpoint {url.path}'}
+    if read_body:
+      try:
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'null')
+      except ValueError:
+        raise BadRequest('body is not valid json')
+      scenarios = request.get('scenarios') if isinstance(request, dict) else None
+      if not isinstance(scenarios, list):
+        raise BadRequest('body must be {"scenarios": [...]}')
+      if len(scenarios) > max_batch:
+        raise BadRequest(f'at most {max_batch} scenarios per request')
+      return 200, {'results': compute(url.path, scenarios, self.server.cache, self.server.cube)}
+    query = dict(urllib.parse.parse_qsl(url.query))
+    return 200, compute(url.path, [query], self.server.cache, self.server.cube)[0]
+
+  def do_GET(self):
+    self.handle_request(read_body=False)
+
+  def do_POST(self):
+    self.handle_request(read_body=True)
+
+class ToldServer(http.server.HTTPServer):
+  # http server handing each connection to a fixed size thread pool
+  def __init__(self, address, workers=8, cache_size=4096, cache_ttl=None, cube=None, idle_timeout=5, verbose=False):
+    super().__init__(address, ToldRequestHandler)
+    self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='told-server')
+    self.workers = workers
+    self.idle_timeout = idle_timeout
+    self.cache = result_cache.ResultCache(cache_size, cache_ttl)
+    self.latency = LatencyStats()
+    # answer_cube.AnswerCube, or None to compute everything
+    self.cube = cube
+    self.verbose = verbose
+
+  def process_request(self, request, client_address):
+    self.pool.submit(self.process_request_thread, request, client_address)
+
+  def process_request_thread(self, request, client_address):
+    try:
+      self.finish_request(request, client_address)
+    except Exception:
+      self.handle_error(request, client_address)
+    finally:
+      self.shutdown_request(request)
+
+  def stats(self):
+    return {'workers': self.workers, 'chart_data_hash': told.chart_data_hash, **self.latency.stats(), 'cache': self.cache.stats(),
+            'answer_cube': None if self.cube is None else self.cube.stats()}
+
+  def server_close(self):
+    super().server_close()
+    self.pool.shutdown(wait=True)
+
+def start_server(host='127.0.0.1', port=0, **kwargs):
+  # start a server on a background thread and return it, port 0 picks a free port (see server.server_address)
+  server = ToldServer((host, port), **kwargs)
+  threading.Thread(target=server.serve_forever, name='told-server-accept', daemon=True).start()
+  return server
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Serve density ratio and MinGo as json over http.')
+  parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default 127.0.0.1)')
+  parser.add_argument('--port', type=int, default=8502, help='port to listen on (default 8502)')
+  parser.add_argument('--workers', type=int, default=8, help='worker threads (default 8)')
+  parser.add_argument('--cache-size', type=int, default=4096, help='most cached results, 0 turns the cache off (default 4096)')
+  parser.add_argument('--cache-ttl', type=float, default=None, help='seconds a cached result is kept (default no limit)')
+  parser.add_argument('--no-answer-cube', action='store_true', help='compute MinGo even when the answer cube has been built')
+  parser.add_argument('--cube-chunks', type=int, default=32, help='most answer cube chunks kept decompressed (default 32)')
+  parser.add_argument('--idle-timeout', type=float, default=5, help='seconds an idle keep-alive connection holds its worker (default 5)')
+  parser.add_argument('--verbose', action='store_true', help='log every request to stderr')
+  args = parser.parse_args(argv)
+
+  cube = None if args.no_answer_cube else answer_cube.load_answer_cube(max_chunks=args.cube_chunks)
+  server = ToldServer((args.host, args.port), workers=args.workers, cache_size=args.cache_size, cache_ttl=args.cache_ttl, cube=cube, idle_timeout=args.idle_timeout, verbose=args.verbose)
+  print(f'serving TOLD on http://{args.host}:{server.server_address[1]}', file=sys.stderr)
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,103 @@
+# startup warm up for the TOLD server. loads and checks the chart data, pages in the memory-mapped density
+# ratio grid and runs the common scenarios (the app's default inputs and one per weight and density ratio band)
+# through the app's pipeline into the process wide result cache the MAX/Dry answer reads, so the first users
+# to connect do not pay for any of it. with --preload the modules only the charts and tables need (pandas,
+# altair, scipy) are imported too. the chart specs are cached per script run by st.cache_data and are not
+# warmed.
+#
+# streamlit has no hook that runs before the first session connects, so this doubles as a launcher that warms
+# up the process and then starts the server in it, taking the same arguments as `streamlit run`, e.g.
+#
+#   python warmup.py --preload -- --server.port 8501
+#
+# and `python warmup.py --check` only warms up and prints how long each step took
+import argparse
+import importlib
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+# the app's default inputs: temperature (F), field elevation (ft), weight (lbs), runway length (ft)
+default_scenario = (60, 0, 56000, 8000)
+preload_modules = ('pandas', 'altair', 'scipy.optimize')
+
+_timings = None
+
+def common_scenarios():
+  # the default inputs plus, at each chart weight band's midpoint, every density ratio band reached by the
+  # default temperature between sea level and the top of the chart
+  import told
+  scenarios = [default_scenario]
+  alts = np.arange(told.altitudes[0], told.altitudes[-1]+1, 1000)
+  for weight in (told.weights[:-1] + told.weights[1:])//2:
+    for alt in alts:
+      scenarios.append((default_scenario[0], int(alt), int(weight), default_scenario[3]))
+  return scenarios
+
+def warm_up(preload=False):
+  # warm the process once, later calls return the timings (seconds per step) of the first
+  global _timings
+  if _timings is not None:
+    return _timings
+  timings = {}
+  start = time.perf_counter()
+  import told
+  timings['import_told'] = time.perf_counter() - start
+
+  start = time.perf_counter()
+  # touch every page of the grid so the first lookups are not page faults
+  if told.density_ratio_grid is not None:
+    float(np.asarray(told.density_ratio_grid).sum())
+  timings['density_ratio_grid'] = time.perf_counter() - start
+
+  start = time.perf_counter()
+  import result_cache
+  # the app's st.cache_data decorators warn that there is no runtime yet, the server starts it later
+  import streamlit
+  caching_logger = logging.getLogger('streamlit.runtime.caching.cache_data_api')
+  level = caching_logger.level
+  caching_logger.setLevel(logging.ERROR)
+  try:
+    import streamlit_app
+  finally:
+    caching_logger.setLevel(level)
+  timings['import_app'] = time.perf_counter() - start
+
+  start = time.perf_counter()
+  # the same entries the app's MAX/Dry answer puts in the shared result cache, so these scenarios are hits
+  cache = streamlit_app.get_result_cache(streamlit_app.result_cache_size, streamlit_app.result_cache_ttl)
+  for scenario in common_scenarios():
+    inputs = dict(zip(('temp', 'alt', 'weight', 'runway_length'), scenario))
+    cache.put(result_cache.told_key(told.chart_data_hash, inputs), streamlit_app.told_pipeline.run(inputs, {})[0])
+  timings['result_cache'] = time.perf_counter() - start
+
+  if preload:
+    start = time.perf_counter()
+    for name in preload_modules:
+      importlib.import_module(name)
+    timings['preload'] = time.perf_counter() - start
+  _timings = timings
+  return timings
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Warm up the TOLD engine, then start the streamlit app in the same process.')
+  parser.add_argument('--preload', action='store_true', help=f'also import {", ".join(preload_modules)} for the charts and tables')
+  parser.add_argument('--check', action='store_true', help='only warm up and print the timings, do not start the app')
+  parser.add_argument('streamlit_args', nargs='*', help='arguments for the app, as for `streamlit run streamlit_app.py`')
+  args = parser.parse_args(argv)
+
+  timings = warm_up(args.preload)
+  print('warm up ' + ', '.join(f'{name} {seconds*1e3:.0f} ms' for name, seconds in timings.items()), file=sys.stderr)
+  if args.check:
+    return
+
+  from streamlit.web import cli
+  sys.argv = ['streamlit', 'run', app_path] + args.streamlit_args
+  cli.main()
+
+if __name__ == '__main__':
+  main()
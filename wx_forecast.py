@@ -0,0 +1,179 @@
+# hourly forecast mode: density ratio and MinGo for every hour of a local temperature forecast, for planning
+# launch windows at one field. the forecast is a csv with a time column (iso 8601, utc unless it carries an
+# offset) and temp_f or temp_c, e.g.
+#
+#   time,temp_f
+#   2026-07-01T06:00,71
+#   2026-07-01T07:00,74
+#
+# rows stream through a generator pipeline (parse_forecast -> told_stream) that batches the hours it has to
+# compute through told.calc_told_batch. every hour is marked with why it is off the charts, if it is: the
+# temperature or elevation off the density ratio chart, the weight or density ratio off the MinGo charts, or
+# the runway too short for them (the -1 region). ForecastSeries rereads the file only when it changes and then
+# only recomputes the hours that are new or whose temperature or inputs changed, so a series follows one set of
+# inputs (one field, weight and runway) and every app session keeps its own, e.g.
+#
+#   python wx_forecast.py forecast.csv --alt 2000 --weight 56000 --runway-length 8000 --watch 60
+import argparse
+import csv
+import datetime
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+import told
+
+# hours computed per batch
+chunk_size = 48
+off_chart_reasons = {
+  'density_ratio': 'temperature or elevation off the density ratio chart',
+  'min_go_chart': 'weight or density ratio off the MinGo charts',
+  'runway': 'runway too short (-1 region)',
+}
+
+def parse_forecast(lines):
+  # a {time, temp_f} dict per forecast row, skipping rows without a time or temperature. every time is made
+  # utc aware so files mixing times with and without offsets still sort and match up
+  for row in csv.DictReader(lines):
+    try:
+      forecast_time = datetime.datetime.fromisoformat(row['time'].strip())
+      if forecast_time.tzinfo is None:
+        forecast_time = forecast_time.replace(tzinfo=datetime.timezone.utc)
+      else:
+        forecast_time = forecast_time.astimezone(datetime.timezone.utc)
+      if row.get('temp_f') not in (None, ''):
+        temp_f = float(row['temp_f'])
+      else:
+        temp_f = float(row['temp_c'])*9/5 + 32
+    except (KeyError, TypeError, ValueError, AttributeError):
+      continue
+    yield {'time': forecast_time, 'temp_f': temp_f}
+
+def off_chart_reason(density_ratio, user_ac_weight, user_runway_length):
+  # why each scenario is off the charts, None for the ones on them
+  reasons = np.full(np.shape(density_ratio), None, dtype=object)
+  reasons[~told.min_go_on_chart(density_ratio, user_ac_weight, user_runway_length)] = 'runway'
+  reasons[~told.on_min_go_charts(density_ratio, user_ac_weight)] = 'min_go_chart'
+  reasons[np.isnan(density_ratio)] = 'density_ratio'
+  return reasons
+
+def _compute(pending, user_alt, user_ac_weight, user_runway_length):
+  # density ratio, MinGo and the off chart reason of the pending rows in one batch
+  temps = np.array([row['temp_f'] for row in pending])
+  density_ratio, min_go = told.calc_told_batch(temps, user_alt, user_ac_weight, user_runway_length)
+  reasons = off_chart_reason(density_ratio, user_ac_weight, user_runway_length)
+  for n, row in enumerate(pending):
+    row['density_ratio'] = None if np.isnan(density_ratio[n]) else float(density_ratio[n])
+    row['min_go'] = None if reasons[n] else float(np.round(min_go[n], 2) + 0.0)
+    row['off_chart'] = reasons[n]
+
+def told_stream(rows, user_alt, user_ac_weight, user_runway_length, previous=None, counts=None):
+  # the forecast rows with density ratio, MinGo and off_chart added, in order. previous maps time -> an earlier
+  # result, which is reused when its temperature and the other inputs are unchanged. the rest are computed
+  # chunk_size at a time, counted in counts['computed'] and counts['reused'] when given
+  previous = previous or {}
+  counts = counts if counts is not None else {}
+  counts.setdefault('computed', 0)
+  counts.setdefault('reused', 0)
+  inputs = (user_alt, user_ac_weight, user_runway_length)
+  buffered, pending = [], []
+  for row in rows:
+    earlier = previous.get(row['time'])
+    if earlier is not None and earlier['temp_f'] == row['temp_f'] and earlier['inputs'] == inputs:
+      buffered.append(earlier)
+      counts['reused'] += 1
+    else:
+      row = {**row, 'inputs': inputs}
+      buffered.append(row)
+      pending.append(row)
+    if len(pending) >= chunk_size:
+      _compute(pending, *inputs)
+      counts['computed'] += len(pending)
+      yield from buffered
+      buffered, pending = [], []
+  if pending:
+    _compute(pending, *inputs)
+    counts['computed'] += len(pending)
+  yield from buffered
+
+class ForecastSeries:
+  # the computed forecast of one file, updated incrementally by update()
+  def __init__(self, path):
+    self.path = path
+    self.stamp = None
+    # the forecast rows of the file as last read, sorted by time
+    self.forecast = []
+    # time -> computed row of the last update
+    self.results = {}
+    self.counts = {'computed': 0, 'reused': 0}
+    self.lock = threading.Lock()
+
+  def _stamp(self):
+    try:
+      stat = os.stat(self.path)
+    except FileNotFoundError:
+      return None
+    return stat.st_mtime_ns, stat.st_size
+
+  def update(self, user_alt, user_ac_weight, user_runway_length):
+    # the rows for these inputs and the counts of hours computed and reused, rereading the file if it changed
+    # and recomputing only the hours that are new or changed
+    with self.lock:
+      stamp = self._stamp()
+      if stamp != self.stamp:
+        if stamp is None:
+          self.forecast = []
+        else:
+          with open(self.path, newline='', errors='replace') as f:
+            # the last row for an hour wins
+            self.forecast = sorted({row['time']: row for row in parse_forecast(f)}.values(), key=lambda row: row['time'])
+        self.stamp = stamp
+      counts = {}
+      rows = list(told_stream(self.forecast, user_alt, user_ac_weight, user_runway_length, self.results, counts))
+      self.results = {row['time']: row for row in rows}
+      self.counts = counts
+      return rows, dict(counts)
+
+def off_chart_windows(rows):
+  # (start, end, reason) of every run of consecutive off chart hours, each hour lasting until the next row
+  windows = []
+  for n, row in enumerate(rows):
+    if not row['off_chart']:
+      continue
+    end = rows[n+1]['time'] if n + 1 < len(rows) else row['time'] + datetime.timedelta(hours=1)
+    if windows and windows[-1][1] == row['time'] and windows[-1][2] == row['off_chart']:
+      windows[-1] = (windows[-1][0], end, row['off_chart'])
+    else:
+      windows.append((row['time'], end, row['off_chart']))
+  return windows
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Density ratio and MinGo for every hour of a temperature forecast.')
+  parser.add_argument('forecast', help='forecast csv with time and temp_f or temp_c columns')
+  parser.add_argument('--alt', type=float, required=True, help='field elevation (ft)')
+  parser.add_argument('--weight', type=float, default=56000, help='aircraft weight (lbs, default 56000)')
+  parser.add_argument('--runway-length', type=float, default=8000, help='runway length (ft, default 8000)')
+  parser.add_argument('--watch', type=float, help='recheck the file every this many seconds and reprint when it changed')
+  args = parser.parse_args(argv)
+
+  series = ForecastSeries(args.forecast)
+  stamp = None
+  while True:
+    rows, counts = series.update(args.alt, args.weight, args.runway_length)
+    if series.stamp != stamp:
+      stamp = series.stamp
+      for row in rows:
+        min_go = 'off chart' if row['off_chart'] else f"{row['min_go']:.2f}"
+        print(f"{row['time'].isoformat()}  {row['temp_f']:6.1f} F  DR {row['density_ratio']}  MinGo {min_go}")
+      for start, end, reason in off_chart_windows(rows):
+        print(f'off chart {start.isoformat()} - {end.isoformat()}: {off_chart_reasons[reason]}')
+      print(f"-- {counts['computed']} hours computed, {counts['reused']} reused", file=sys.stderr)
+    if args.watch is None:
+      break
+    time.sleep(args.watch)
+
+if __name__ == '__main__':
+  main()
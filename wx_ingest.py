@@ -0,0 +1,185 @@
+# METAR/TAF ingestion from a local drop directory. raw report text files (*.txt, *.metar, *.taf) are parsed
+# concurrently with asyncio, the latest report per station gives its temperature, and density ratio and
+# MinGo are computed for every station in one batched pass through told.calc_told_batch.
+#
+# METARs carry the temperature but not the field elevation, so elevations come from stations.csv in the same
+# directory (columns icao, elevation_ft). TAFs give the forecast maximum temperature (TX group), the limiting
+# case for TOLD. each scan only rereads files whose size or modification time changed, e.g.
+#
+#   python wx_ingest.py wx/ --weight 56000 --runway-length 8000 --watch 30
+import argparse
+import asyncio
+import csv
+import io
+import os
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+
+import told
+
+report_suffixes = ('.txt', '.metar', '.taf')
+stations_file = 'stations.csv'
+# most files read and parsed at once
+max_concurrent_reads = 16
+
+# a report starts on a new line with an optional type, the station and the issue time
+_report_start = re.compile(r'^[ \t]*(?:(METAR|SPECI|TAF)(?:[ \t]+(?:AMD|COR))*[ \t]+)?([A-Z][A-Z0-9]{3})[ \t]+(\d{6})Z\b', re.M)
+_taf_validity = re.compile(r'^\s+\d{4}/\d{4}\b')
+_metar_temperature = re.compile(r'(?<!\S)(M?\d{2})/(M?\d{2})?(?!\S)')
+_taf_max_temperature = re.compile(r'(?<!\S)TX(M?\d{2})/\d{4}Z(?!\S)')
+
+def _celsius(group):
+  return -int(group[1:]) if group.startswith('M') else int(group)
+
+def parse_reports(text):
+  # every METAR/SPECI/TAF in text as dicts of station, kind, issue time (ddhhmm) and temperature in F
+  reports = []
+  starts = list(_report_start.finditer(text))
+  for n, start in enumerate(starts):
+    body = text[start.end():starts[n+1].start() if n + 1 < len(starts) else len(text)].split('=')[0]
+    kind = start.group(1) or ('TAF' if _taf_validity.match(body) else 'METAR')
+    if kind == 'TAF':
+      temperatures = [_celsius(t) for t in _taf_max_temperature.findall(body)]
+      temperature = max(temperatures) if temperatures else None
+    else:
+      match = _metar_temperature.search(body)
+      temperature = _celsius(match.group(1)) if match else None
+    reports.append({
+      'station': start.group(2), 'kind': kind, 'issued': start.group(3),
+      'temp_f': None if temperature is None else temperature*9/5 + 32,
+    })
+  return reports
+
+def parse_stations(text):
+  # station -> field elevation (ft) from the stations csv
+  elevations = {}
+  for row in csv.DictReader(io.StringIO(text)):
+    try:
+      elevations[row['icao'].strip().upper()] = float(row['elevation_ft'])
+    except (KeyError, TypeError, ValueError, AttributeError):
+      continue
+  return elevations
+
+def _read(path):
+  with open(path, errors='replace') as f:
+    return f.read()
+
+class DropDirectory:
+  # the parsed state of one drop directory, updated incrementally by scan()
+  def __init__(self, path):
+    self.path = path
+    # file name -> ((mtime_ns, size), parsed reports)
+    self.files = {}
+    self.elevations = {}
+    self.stations_stamp = None
+    # bumped whenever a scan changes anything, results are recomputed only when it moves
+    self.version = 0
+    self.lock = threading.Lock()
+    self._results = None
+
+  def _listing(self):
+    listing = {}
+    try:
+      entries = list(os.scandir(self.path))
+    except FileNotFoundError:
+      return listing
+    for entry in entries:
+      if entry.is_file() and (entry.name == stations_file or entry.name.lower().endswith(report_suffixes)):
+        stat = entry.stat()
+        listing[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return listing
+
+  async def _parse_files(self, names):
+    semaphore = asyncio.Semaphore(max_concurrent_reads)
+    async def parse(name):
+      async with semaphore:
+        text = await asyncio.to_thread(_read, os.path.join(self.path, name))
+        return name, await asyncio.to_thread(parse_reports, text)
+    return await asyncio.gather(*(parse(name) for name in names))
+
+  async def scan_async(self):
+    # reread new and changed files, forget deleted ones, and return the names that changed
+    listing = self._listing()
+    stations_stamp = listing.pop(stations_file, None)
+    changed = [name for name, stamp in listing.items() if name not in self.files or self.files[name][0] != stamp]
+    deleted = [name for name in self.files if name not in listing]
+    parsed = await self._parse_files(changed)
+    if stations_stamp != self.stations_stamp:
+      self.elevations = parse_stations(await asyncio.to_thread(_read, os.path.join(self.path, stations_file))) if stations_stamp else {}
+      self.stations_stamp = stations_stamp
+      changed.append(stations_file)
+
+    for name in deleted:
+      del self.files[name]
+    for name, reports in parsed:
+      self.files[name] = (listing[name], reports)
+    if changed or deleted:
+      self.version += 1
+    return changed + deleted
+
+  def scan(self):
+    with self.lock:
+      return asyncio.run(self.scan_async())
+
+  def latest_reports(self):
+    # the latest issued report with a temperature for every station, preferring observations (METAR/SPECI) over
+    # TAFs issued at the same time. the file modification time only breaks ties, a file written later can
+    # still hold an older report
+    latest = {}
+    for (mtime_ns, _), reports in self.files.values():
+      for report in reports:
+        if report['temp_f'] is None:
+          continue
+        rank = (report['issued'], report['kind'] != 'TAF', mtime_ns)
+        if report['station'] not in latest or rank > latest[report['station']][0]:
+          latest[report['station']] = (rank, report)
+    return [report for _, report in sorted(latest.values(), key=lambda item: item[1]['station'])]
+
+  def results(self, user_ac_weight, user_runway_length):
+    # one row per station with density ratio and MinGo, computed in one batch and reused until a scan changes
+    # something or the weight or runway length change
+    with self.lock:
+      key = (self.version, user_ac_weight, user_runway_length)
+      if self._results is not None and self._results[0] == key:
+        return self._results[1]
+      reports = self.latest_reports()
+      temps = np.array([report['temp_f'] for report in reports], dtype=float)
+      alts = np.array([self.elevations.get(report['station'], np.nan) for report in reports], dtype=float)
+      density_ratio, min_go = told.calc_told_batch(temps, alts, user_ac_weight, user_runway_length)
+      on_chart = told.min_go_on_chart(density_ratio, user_ac_weight, user_runway_length)
+      rows = []
+      for n, report in enumerate(reports):
+        rows.append({
+          'Station': report['station'], 'Report': report['kind'], 'Issued': report['issued'] + 'Z',
+          'Temp(F)': round(report['temp_f'], 1), 'Field Elevation (ft)': None if np.isnan(alts[n]) else float(alts[n]),
+          'Density Ratio': None if np.isnan(density_ratio[n]) else float(density_ratio[n]),
+          'MinGo': float(np.round(min_go[n], 2) + 0.0) if on_chart[n] else None,
+        })
+      self._results = (key, rows)
+      return rows
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Compute density ratio and MinGo for every station in a METAR/TAF drop directory.')
+  parser.add_argument('directory', help='directory of raw METAR/TAF text files and stations.csv')
+  parser.add_argument('--weight', type=float, default=56000, help='aircraft weight (lbs, default 56000)')
+  parser.add_argument('--runway-length', type=float, default=8000, help='runway length (ft, default 8000)')
+  parser.add_argument('--watch', type=float, help='rescan every this many seconds and reprint when anything changed')
+  args = parser.parse_args(argv)
+
+  drop = DropDirectory(args.directory)
+  while True:
+    changed = drop.scan()
+    if changed:
+      for row in drop.results(args.weight, args.runway_length):
+        print('  '.join(f'{name}={value}' for name, value in row.items()))
+      print(f'-- {len(changed)} changed files', file=sys.stderr)
+    if args.watch is None:
+      break
+    time.sleep(args.watch)
+
+if __name__ == '__main__':
+  main()